@@ -1,17 +1,83 @@
 import streamlit as st
 import os
+import threading
 import time
 from dotenv import load_dotenv
-from prompts import get_interview_prompt
-from utils.report import generate_report
-from utils.charts import create_donut_chart
 
 # =========================
 # Load environment variables
 # =========================
+# Loaded before the project imports so settings such as METRICS_ENABLED in .env take effect
 load_dotenv()
 
+from prompts import (
+    get_adaptive_scheduler, get_interview_prompt, next_adaptive_question,
+    prefetch_ai_questions, resume_interview_questions, start_ai_interview,
+)
+from utils import metrics
+from utils.evaluation import GradingQueue
+from utils.interview_state import FREE_TEXT, NOT_ANSWERED, SKIPPED, InterviewRecord, choice_index
+from utils.question_bank import question_id
+from utils.seen import get_seen_store
+from utils.session_store import get_session_store, new_session_id
+from utils.summary import build_summary_artifacts, interview_fingerprint
+from utils.timing import PhaseTimer
+
 st.set_page_config(page_title="Interview Preparation Bot", layout="wide")
+timer = PhaseTimer()
+metrics.start_exporters()
+
+# How long the summary page waits for outstanding free-text grades before offering a refresh
+GRADING_WAIT = float(os.environ.get("GRADING_WAIT", 60))
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_summary_artifacts(fingerprint, _questions, _answers, _feedback, score, time_taken, mode=None, _elapsed_ms=None,
+                           interactive=False, _scores=None, session_id=None):
+    """
+    Ranking, charts and PDF for a finished interview, computed once per fingerprint.
+    Arguments prefixed with _ are not hashed by Streamlit; the fingerprint covers them.
+    """
+    return build_summary_artifacts(
+        _questions, _answers, _feedback, score, time_taken, mode, _elapsed_ms, interactive, _scores, session_id
+    )
+
+
+def record_results(time_taken):
+    """Appends the finished interview to the historical results store (once per session)."""
+    meta = st.session_state.get("interview_meta")
+    if meta is None or st.session_state.session_id is None:
+        return
+    interview = st.session_state.interview
+    try:
+        from utils.results_store import get_results_store
+
+        get_results_store().record_interview(
+            st.session_state.session_id, meta.get("user_id"), meta,
+            interview.questions(), interview.outcomes(), time_taken,
+        )
+    except Exception as e:
+        print(f"Could not record interview results: {e}")
+
+
+def show_progress(user_id):
+    """Renders the candidate's accuracy trend from past interviews; skipped if the results store is unavailable."""
+    try:
+        from utils.results_store import get_results_store
+
+        trend = get_results_store().user_trend(user_id)
+    except Exception as e:
+        print(f"Progress tracking unavailable: {e}")
+        return False
+    if trend.empty:
+        return False
+    st.markdown(f"<h5>Progress over your last {len(trend)} interviews</h5>", unsafe_allow_html=True)
+    st.line_chart(
+        trend.set_index("finished_at")[["accuracy", "rolling_accuracy"]] * 100,
+        y_label="Accuracy (%)",
+    )
+    return True
+
 
 # =========================
 # Custom CSS (Dark Theme, Modern UI)
@@ -81,206 +147,449 @@ h1, h2, h3 {
 # =========================
 # Session State Initialization
 # =========================
-if "questions" not in st.session_state:
-    st.session_state.questions = []
-if "answers" not in st.session_state:
-    st.session_state.answers = []
-if "feedback" not in st.session_state:
-    st.session_state.feedback = []
-if "step" not in st.session_state:
-    st.session_state.step = 0
-if "score" not in st.session_state:
-    st.session_state.score = 0
+# Questions and outcomes live in one compact record; see utils/interview_state.py
+if "interview" not in st.session_state:
+    st.session_state.interview = InterviewRecord()
 if "interview_start_time" not in st.session_state:
     st.session_state.interview_start_time = 0
 if "ranking" not in st.session_state:
     st.session_state.ranking = None
+if "question_stream" not in st.session_state:
+    st.session_state.question_stream = None
+if "session_id" not in st.session_state:
+    st.session_state.session_id = None
+    st.session_state.saved_questions = 0
+if "question_started_at" not in st.session_state:
+    st.session_state.question_started_at = 0
+if "grading" not in st.session_state:
+    st.session_state.grading = None
+if "scheduler" not in st.session_state:
+    st.session_state.scheduler = None
+    st.session_state.num_questions = 0
 
-# =========================
-# Sidebar Settings
-# =========================
-st.sidebar.title("⚙️ Setup Interview")
 
-use_ai = st.sidebar.toggle("🤖 Use AI-Generated Questions", help="Generates unique questions using AI. Requires a Google AI API key in your .env file.")
+def restore_session(session_id):
+    """Rebuilds the interview state from the session store after a reload, restart or replica switch."""
+    saved = get_session_store().load(session_id)
+    if saved is None:
+        return False
+    meta, answers = saved["meta"], saved["answers"]
+    seen = get_seen_store().get(meta["user_id"]) if meta.get("adaptive") and meta.get("user_id") else None
+    # Any question picked here is stored before saved_questions counts it
+    questions, scheduler = resume_interview_questions(get_session_store(), session_id, saved, seen)
 
-custom_set = st.sidebar.selectbox(
-    "Custom Question Set",
-    ["Standard", "FAANG / MAANG"],
-    disabled=use_ai
-)
+    interview = InterviewRecord(questions)
+    for q, a in zip(questions, answers):
+        # Older checkpoints stored the answer text instead of the choice index
+        if "x" in a:
+            interview.record_text(a["x"], a.get("ms"))
+        else:
+            interview.record(a["i"] if "i" in a else choice_index(q, a["a"]), a["c"], a.get("ms"))
+    # Grades are not checkpointed; free-text answers are graded again after a restore
+    grading = None
+    if meta.get("free_text"):
+        grading = GradingQueue(meta["mode"])
+        for index in interview.ungraded():
+            grading.submit(index, interview.question(index)["q"], interview.answer_text(index))
 
-if custom_set == "Standard":
-    role = st.sidebar.selectbox("Role", ["Software Engineer", "Product Manager", "Data Analyst"])
-    mode = st.sidebar.radio("Mode", ["Technical", "Behavioral"])
-else:
-    st.sidebar.markdown("---")
-    st.sidebar.info(f"Using the **{custom_set}** question set.")
-    role = "Software Engineer" # Default for FAANG set
-    mode = "Technical" # Default for FAANG set
-
-num_qs = st.sidebar.slider("Number of Questions", 3, 10, 3)
-
-if st.sidebar.button("🚀 Start Interview"):
-    spinner_text = "🤖 Generating unique questions..." if use_ai or custom_set == "FAANG / MAANG" else "Preparing your interview..."
-    with st.spinner(spinner_text):
-        questions, error_message = get_interview_prompt(role, mode, num_qs, custom_set, use_ai)
-        if error_message:
-            st.warning(error_message) # Use a warning for fallback, error for complete failure
-        if not questions:
-            st.error("Could not load any questions. Please try again.")
-            st.stop()
-        st.session_state.questions = questions
-
-    # Reset state for the new interview
-    st.session_state.answers = []
-    st.session_state.feedback = []
-    st.session_state.step = 0
-    st.session_state.score = 0
-    st.session_state.interview_start_time = time.time()
+    st.session_state.session_id = session_id
+    st.session_state.saved_questions = len(questions)
+    st.session_state.interview = interview
+    st.session_state.grading = grading
+    st.session_state.question_stream = None
+    st.session_state.scheduler = scheduler
+    st.session_state.num_questions = meta["num_qs"] if scheduler else len(questions)
+    st.session_state.question_started_at = time.time()
+    st.session_state.interview_start_time = meta["started_at"]
+    st.session_state.interview_meta = meta
     st.session_state.ranking = None
-    st.rerun()
+    if answers and len(answers) >= len(questions):
+        st.session_state.finished_at = answers[-1]["t"]
+    return True
 
-# =========================
-# Main UI Logic
-# =========================
-st.title("Interview Preparation Bot")
-st.markdown(
-    "<p style='color:var(--muted); font-size:16px;'>"
-    "Practice your interview skills with AI-powered feedback. "
-    "Select your role, choose between technical or behavioral questions, "
-    "and get detailed feedback to improve performance."
-    "</p>",
-    unsafe_allow_html=True
-)
 
-# Landing Page
-if not st.session_state.questions:
-    st.info("Configure your interview settings in the sidebar and click **Start Interview** when ready.")
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.markdown("<div class='card'><div class='card-icon'>🎯</div><b>Role-Specific Questions</b><span>Practice tailored questions for your chosen role.</span></div>", unsafe_allow_html=True)
-    with col2:
-        st.markdown("<div class='card'><div class='card-icon'>🤖</div><b>AI-Powered Feedback</b><span>Get detailed scoring and suggestions.</span></div>", unsafe_allow_html=True)
-    with col3:
-        st.markdown("<div class='card'><div class='card-icon'>📊</div><b>Progress Tracking</b><span>Track your growth with reports.</span></div>", unsafe_allow_html=True)
-else:
-    step = st.session_state.step
-    total_questions = len(st.session_state.questions)
-
-    # Interview Flow
-    if step < total_questions:
-        elapsed_time = time.time() - st.session_state.get('interview_start_time', time.time())
-        
-        header_cols = st.columns([3, 1])
-        with header_cols[0]:
-            st.markdown(f"### Question {step + 1}/{total_questions}")
-        with header_cols[1]:
-            st.info(f"⏳ {int(elapsed_time // 60):02d}:{int(elapsed_time % 60):02d}")
-
-        q = st.session_state.questions[step]
-        st.markdown(f"<div class='card'>{q['q']}</div>", unsafe_allow_html=True)
-
-        choice = st.radio("Choose your answer:", q.get("options", []), index=None, key=f"mcq_{step}")
-
-        # Submit and Skip buttons
-        col1, col2 = st.columns([1, 0.1])
-        if col1.button("Submit", key=f"submit_{step}"):
-            if choice:
-                is_correct = choice == q["answer"]
-                st.session_state.feedback.append("✅ Correct" if is_correct else f"❌ Incorrect (Correct Answer: {q['answer']})")
-                if is_correct:
-                    st.session_state.score += 1
-                st.session_state.answers.append(choice)
+def checkpoint_answer(step, choice, correct, elapsed_ms, text=None):
+    """Appends one answer record, plus any questions that streamed in since the last checkpoint."""
+    store = get_session_store()
+    session_id = st.session_state.session_id
+    if session_id is None:
+        return
+    interview = st.session_state.interview
+    if interview.question_count > st.session_state.saved_questions:
+        store.add_questions(session_id, interview.questions(), st.session_state.saved_questions)
+        st.session_state.saved_questions = interview.question_count
+    record = {"i": choice, "c": int(correct), "ms": elapsed_ms, "t": time.time()}
+    if text is not None:
+        record["x"] = text
+    store.append_answer(session_id, step, record)
+
+
+def record_answer(choice, correct, text=None):
+    """
+    Records the outcome and latency of the current question and moves to the next one.
+    `choice` is the chosen option's index, or SKIPPED / NOT_ANSWERED; a free-text
+    answer passes FREE_TEXT and its `text`, which is queued for background grading.
+    """
+    interview = st.session_state.interview
+    step = interview.answered
+    elapsed_ms = int((time.time() - st.session_state.question_started_at) * 1000)
+    if choice == FREE_TEXT:
+        interview.record_text(text, elapsed_ms)
+        st.session_state.grading.submit(step, interview.question(step)["q"], text)
+    else:
+        interview.record(choice, correct, elapsed_ms)
+    checkpoint_answer(step, choice, correct, elapsed_ms, text)
+    user_id = (st.session_state.get("interview_meta") or {}).get("user_id")
+    if user_id:
+        get_seen_store().mark(user_id, [question_id(interview.question(step))])
+
+    scheduler = st.session_state.scheduler
+    if scheduler is not None:
+        scheduler.record(correct)
+        if interview.question_count < st.session_state.num_questions:
+            question = next_adaptive_question(scheduler)
+            if question is None:
+                # Pool exhausted: end the interview early
+                st.session_state.num_questions = interview.question_count
             else:
-                st.session_state.answers.append("Not Answered")
-                st.session_state.feedback.append("Skipped")
-            st.session_state.step += 1
-            st.rerun()
-
-        if col2.button("Skip", key=f"skip_{step}"):
-            st.session_state.answers.append("Skipped")
-            st.session_state.feedback.append("Skipped")
-            st.session_state.step += 1
-            st.rerun()
-
-    # Summary Report
+                interview.add_questions([question])
+    st.session_state.question_started_at = time.time()
+
+
+def finish_rerun():
+    """Stops this rerun's profiler and records its phase timings."""
+    if profiler is not None:
+        profiler.stop()
+    st.session_state.rerun_timings = timer.phases
+    for phase, seconds in timer.phases:
+        metrics.observe("app_rerun_phase_seconds", seconds, phase=phase)
+    metrics.observe("app_rerun_seconds", timer.total())
+
+
+def apply_grades():
+    """Moves grades finished by the background pool into the interview record."""
+    grading = st.session_state.grading
+    if grading is None:
+        return
+    for index, evaluation in grading.drain():
+        st.session_state.interview.set_grade(index, evaluation.feedback, evaluation.score)
+
+
+# Optional per-session sampling profiler, toggled from the sidebar when metrics are enabled
+profiler = None
+if st.session_state.get("profile_session"):
+    profiler = metrics.SamplingProfiler(threading.get_ident()).start()
+
+# st.rerun() and st.stop() end a rerun by raising, so the profiler is stopped and the
+# rerun timings recorded in a finally block that runs however the script exits
+try:
+    # Resume the interview named in the URL when this browser session has no state yet
+    if not st.session_state.interview.question_count and st.query_params.get("sid"):
+        if not restore_session(st.query_params["sid"]):
+            del st.query_params["sid"]
+
+    # =========================
+    # Sidebar Settings
+    # =========================
+    st.sidebar.title("⚙️ Setup Interview")
+
+    use_ai = st.sidebar.toggle("🤖 Use AI-Generated Questions", help="Generates unique questions using AI. Requires a Google AI API key in your .env file.")
+
+    custom_set = st.sidebar.selectbox(
+        "Custom Question Set",
+        ["Standard", "FAANG / MAANG"],
+        disabled=use_ai
+    )
+
+    if custom_set == "Standard":
+        role = st.sidebar.selectbox("Role", ["Software Engineer", "Product Manager", "Data Analyst"])
+        mode = st.sidebar.radio("Mode", ["Technical", "Behavioral"])
     else:
-        # --- Calculation Block (run once) ---
-        if st.session_state.ranking is None:
-            end_time = time.time()
-            time_taken = end_time - st.session_state.get('interview_start_time', end_time)
-            st.session_state.time_taken = time_taken
-
-            def calculate_ranking(score, total_questions, time_taken):
-                if total_questions == 0:
-                    return "N/A", "Complete an interview to get a rank."
-
-                accuracy = (score / total_questions) * 100
-                avg_time_per_q = time_taken / total_questions
-
-                if accuracy >= 95 and avg_time_per_q < 30:
-                    return "S-Tier (Godlike)", "Flawless accuracy and lightning-fast responses. Truly top-tier performance."
-                elif accuracy >= 80 and avg_time_per_q < 60:
-                    return "A-Tier (Expert)", "High accuracy and great speed. You're well-prepared for technical challenges."
-                elif accuracy >= 60:
-                    return "B-Tier (Proficient)", "Good accuracy. Focus on increasing your response speed and deepening your knowledge."
-                elif accuracy >= 40:
-                    return "C-Tier (Competent)", "You have a foundational understanding. Consistent practice will improve your accuracy."
-                else:
-                    return "D-Tier (Beginner)", "A good first step. Focus on reviewing fundamentals and trying again."
-
-            rank, desc = calculate_ranking(st.session_state.score, total_questions, st.session_state.time_taken)
-            st.session_state.ranking = rank
-            st.session_state.ranking_description = desc
-
-
-        st.success("✅ Interview Complete!")
-        st.subheader("📊 Summary Report")
-
-        # --- Metrics Row ---
-        m1, m2, m3 = st.columns(3)
-        accuracy_percent = (st.session_state.score / total_questions) * 100 if total_questions > 0 else 0
-        m1.metric("Final Score", f"{st.session_state.score}/{total_questions}", f"{accuracy_percent:.2f}%")
-        m2.metric("Total Time", f"{st.session_state.time_taken:.2f}s")
-        m3.metric("Your Rank", st.session_state.ranking)
-        st.markdown(f"> *{st.session_state.ranking_description}*")
-        
-        with st.expander("How are rankings calculated?"):
-            st.markdown("""
-            - **S-Tier (Godlike):** >95% accuracy & <30s per question.
-            - **A-Tier (Expert):** >80% accuracy & <60s per question.
-            - **B-Tier (Proficient):** >60% accuracy.
-            - **C-Tier (Competent):** >40% accuracy.
-            - **D-Tier (Beginner):** <=40% accuracy.
-            """)
-        st.write("---")
-
-
-        # --- Charts Row ---
-        col1, col2 = st.columns(2)
+        st.sidebar.markdown("---")
+        st.sidebar.info(f"Using the **{custom_set}** question set.")
+        role = "Software Engineer" # Default for FAANG set
+        mode = "Technical" # Default for FAANG set
+
+    num_qs = st.sidebar.slider("Number of Questions", 3, 10, 3)
+    free_text = st.sidebar.toggle(
+        "✍️ Free-Text Answers",
+        help="Answer in your own words. Answers are graded by AI in the background while you carry on.",
+    )
+    adaptive = st.sidebar.toggle(
+        "🎯 Adaptive Difficulty", disabled=use_ai or free_text,
+        help="Picks each next preset question based on how well you are doing so far.",
+    ) and not use_ai and not free_text
+    interactive_charts = st.sidebar.toggle(
+        "📈 Interactive Charts", help="Renders the summary with plotly instead of static charts. Slower to load.",
+    )
+    candidate_id = st.sidebar.text_input("Candidate ID (optional)", help="Used to track your progress across interviews.").strip()
+
+    if metrics.ENABLED:
+        st.sidebar.toggle("🔬 Profile this session", key="profile_session")
+
+    # Start generating AI questions for the current selection before the user clicks Start
+    if use_ai:
+        prefetch_ai_questions(role, mode, custom_set)
+
+    if st.sidebar.button("🚀 Start Interview"):
+        spinner_text = "🤖 Generating unique questions..." if use_ai or custom_set == "FAANG / MAANG" else "Preparing your interview..."
+        with st.spinner(spinner_text):
+            # Questions this candidate has already answered are avoided where the pool allows
+            seen = get_seen_store().get(candidate_id) if candidate_id else None
+            if use_ai:
+                # Questions stream in the background; only wait for the first one
+                stream = start_ai_interview(role, mode, num_qs, custom_set, seen, candidate_id)
+                stream.wait_for(1)
+                questions, error_message = stream.questions, (stream.error if stream.done else None)
+            elif adaptive:
+                stream = None
+                scheduler = get_adaptive_scheduler(role, mode, custom_set, seen)
+                first = next_adaptive_question(scheduler)
+                questions, error_message = ([first] if first else []), None
+            else:
+                stream = None
+                questions, error_message = get_interview_prompt(role, mode, num_qs, custom_set, use_ai, seen)
+            if error_message:
+                st.warning(error_message) # Use a warning for fallback, error for complete failure
+            if not questions:
+                st.error("Could not load any questions. Please try again.")
+                st.stop()
+            # Resets the answers too; a stream's later questions are synced in as they arrive
+            st.session_state.interview = InterviewRecord(questions)
+            st.session_state.question_stream = stream
+            st.session_state.grading = GradingQueue(mode) if free_text else None
+            st.session_state.scheduler = scheduler if adaptive and not use_ai else None
+            st.session_state.num_questions = num_qs if st.session_state.scheduler else len(questions)
+
+        # Reset state for the new interview
+        st.session_state.interview_start_time = time.time()
+        st.session_state.question_started_at = st.session_state.interview_start_time
+        st.session_state.ranking = None
+        st.session_state.pop("finished_at", None)
+
+        session_id = new_session_id()
+        st.session_state.interview_meta = {
+            "role": role, "mode": mode, "custom_set": custom_set, "num_qs": num_qs,
+            "use_ai": use_ai, "adaptive": st.session_state.scheduler is not None, "free_text": free_text,
+            "user_id": candidate_id or None,
+            "started_at": st.session_state.interview_start_time,
+        }
+        get_session_store().create(session_id, st.session_state.interview_meta, st.session_state.interview.questions())
+        st.session_state.session_id = session_id
+        st.session_state.saved_questions = st.session_state.interview.question_count
+        st.query_params["sid"] = session_id
+        st.rerun()
+
+    timer.lap("sidebar")
+
+    # =========================
+    # Main UI Logic
+    # =========================
+    st.title("Interview Preparation Bot")
+    st.markdown(
+        "<p style='color:var(--muted); font-size:16px;'>"
+        "Practice your interview skills with AI-powered feedback. "
+        "Select your role, choose between technical or behavioral questions, "
+        "and get detailed feedback to improve performance."
+        "</p>",
+        unsafe_allow_html=True
+    )
+
+    # Landing Page
+    interview = st.session_state.interview
+    apply_grades()
+    if not interview.question_count:
+        st.info("Configure your interview settings in the sidebar and click **Start Interview** when ready.")
+        col1, col2, col3 = st.columns(3)
         with col1:
-            st.markdown("<h5>Overall Performance</h5>", unsafe_allow_html=True)
-            donut_fig = create_donut_chart(st.session_state.score, total_questions)
-            st.plotly_chart(donut_fig, use_container_width=True)
-
-        
-        st.write("---")
-        st.subheader("💡 Detailed Feedback")
-        for i, (q, ans, fb) in enumerate(zip(st.session_state.questions, st.session_state.answers, st.session_state.feedback)):
-            with st.expander(f"**Q{i+1}: {q['q']}**"):
-                st.write(f"📝 **Your Answer:** {ans}")
-                st.write(f"💬 **Feedback:** {fb}")
-
-        # PDF Report Download
-        pdf_path = generate_report(
-            [q['q'] for q in st.session_state.questions],
-            st.session_state.answers,
-            [{"feedback": fb, "score": (1 if '✅ Correct' in fb else 0)} for fb in st.session_state.feedback]
-        )
-        with open(pdf_path, "rb") as pdf_file:
+            st.markdown("<div class='card'><div class='card-icon'>🎯</div><b>Role-Specific Questions</b><span>Practice tailored questions for your chosen role.</span></div>", unsafe_allow_html=True)
+        with col2:
+            st.markdown("<div class='card'><div class='card-icon'>🤖</div><b>AI-Powered Feedback</b><span>Get detailed scoring and suggestions.</span></div>", unsafe_allow_html=True)
+        with col3:
+            st.markdown("<div class='card'><div class='card-icon'>📊</div><b>Progress Tracking</b><span>Track your growth with reports.</span></div>", unsafe_allow_html=True)
+        if candidate_id:
+            show_progress(candidate_id)
+        timer.lap("landing_render")
+    else:
+        step = interview.answered
+        stream = st.session_state.question_stream
+        if stream:
+            interview.sync(stream.questions)
+            total_questions = stream.total()
+        elif st.session_state.scheduler is not None:
+            total_questions = st.session_state.num_questions
+        else:
+            total_questions = interview.question_count
+
+        # Wait for the next streamed question if the candidate has caught up with the model
+        if stream and step < total_questions and step >= interview.question_count:
+            with st.spinner("🤖 Generating the next question..."):
+                stream.wait_for(step + 1)
+            if stream.error:
+                st.warning(stream.error)
+            interview.sync(stream.questions)
+            total_questions = stream.total()
+
+        # Interview Flow
+        if step < total_questions:
+            elapsed_time = time.time() - st.session_state.get('interview_start_time', time.time())
+            
+            header_cols = st.columns([3, 1])
+            with header_cols[0]:
+                st.markdown(f"### Question {step + 1}/{total_questions}")
+            with header_cols[1]:
+                st.info(f"⏳ {int(elapsed_time // 60):02d}:{int(elapsed_time % 60):02d}")
+
+            q = interview.question(step)
+            st.markdown(f"<div class='card'>{q['q']}</div>", unsafe_allow_html=True)
+
+            grading = st.session_state.grading
+            if grading is not None:
+                choice = st.text_area("Your answer:", key=f"text_{step}").strip()
+                pending = grading.pending()
+                if pending:
+                    st.caption(f"⏳ Grading {pending} earlier answer(s) in the background")
+            else:
+                choice = st.radio("Choose your answer:", q.get("options", []), index=None, key=f"mcq_{step}")
+
+            # Submit and Skip buttons
+            col1, col2 = st.columns([1, 0.1])
+            if col1.button("Submit", key=f"submit_{step}"):
+                if choice and grading is not None:
+                    record_answer(FREE_TEXT, False, text=choice)
+                elif choice:
+                    record_answer(choice_index(q, choice), choice == q["answer"])
+                else:
+                    record_answer(NOT_ANSWERED, False)
+                st.rerun()
+
+            if col2.button("Skip", key=f"skip_{step}"):
+                record_answer(SKIPPED, False)
+                st.rerun()
+            timer.lap("interview_render")
+
+        # Summary Report
+        else:
+            # Free-text grades usually finish while the last answers are written; wait for any stragglers
+            grading = st.session_state.grading
+            if interview.ungraded():
+                with st.spinner(f"🤖 Grading {len(interview.ungraded())} answer(s)..."):
+                    grading.wait(timeout=GRADING_WAIT)
+                apply_grades()
+                if interview.ungraded():
+                    st.warning("Some answers are still being graded.")
+                    if st.button("🔄 Refresh"):
+                        st.rerun()
+                    st.stop()
+            # Display strings are rendered from the compact record only for the summary
+            questions, answers, feedback = interview.questions(), interview.answers(), interview.feedback()
+            elapsed_ms, score = interview.elapsed_ms(), interview.score
+            # --- Calculation Block (run once) ---
+            first_render = st.session_state.ranking is None
+            if first_render:
+                # A restored, already finished interview keeps its original end time
+                end_time = st.session_state.pop("finished_at", None) or time.time()
+                time_taken = end_time - st.session_state.get('interview_start_time', end_time)
+                st.session_state.time_taken = time_taken
+                st.session_state.interview_fingerprint = interview_fingerprint(
+                    questions, answers, feedback, score, time_taken
+                )
+
+            # Ranked before this interview is recorded, so it is compared only with past interviews
+            artifacts = load_summary_artifacts(
+                st.session_state.interview_fingerprint,
+                questions, answers, feedback, score, st.session_state.time_taken,
+                (st.session_state.get("interview_meta") or {}).get("mode"),
+                elapsed_ms,
+                interactive_charts,
+                interview.scores() if interview.texts else None,
+                st.session_state.session_id,
+            )
+            if first_render:
+                record_results(st.session_state.time_taken)
+            st.session_state.ranking, st.session_state.ranking_description = artifacts["ranking"]
+            timer.lap("summary_artifacts")
+
+            st.success("✅ Interview Complete!")
+            st.subheader("📊 Summary Report")
+
+            # --- Metrics Row ---
+            m1, m2, m3 = st.columns(3)
+            accuracy_percent = (score / total_questions) * 100 if total_questions > 0 else 0
+            m1.metric("Final Score", f"{score}/{total_questions}", f"{accuracy_percent:.2f}%")
+            m2.metric("Total Time", f"{st.session_state.time_taken:.2f}s")
+            m3.metric("Your Rank", st.session_state.ranking)
+            st.markdown(f"> *{st.session_state.ranking_description}*")
+            
+            with st.expander("How are rankings calculated?"):
+                st.markdown("""
+                Each interview gets a score that weights every correct answer by the question's
+                difficulty, with extra credit for answering quickly. Your rank is your percentile
+                among past interviews in the same mode:
+                - **S-Tier (Godlike):** top 5%.
+                - **A-Tier (Expert):** top 20%.
+                - **B-Tier (Proficient):** top 50%.
+                - **C-Tier (Competent):** top 80%.
+                - **D-Tier (Beginner):** everyone else.
+
+                Until enough interviews have been recorded, fixed thresholds are used instead:
+                S >95% accuracy & <30s per question, A >80% & <60s, B >60%, C >40%, D <=40%.
+                """)
+            st.write("---")
+
+
+            # --- Charts Row ---
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("<h5>Overall Performance</h5>", unsafe_allow_html=True)
+                if artifacts["figure"] is not None:
+                    st.plotly_chart(artifacts["figure"], use_container_width=True)
+                else:
+                    st.markdown(artifacts["donut_svg"], unsafe_allow_html=True)
+            user_id = st.session_state.interview_meta.get("user_id") if st.session_state.get("interview_meta") else None
+            if user_id:
+                with col2:
+                    show_progress(user_id)
+
+            col3, col4 = st.columns(2)
+            with col3:
+                st.markdown("<h5>Per Question</h5>", unsafe_allow_html=True)
+                st.markdown(artifacts["questions_svg"], unsafe_allow_html=True)
+                st.caption("Green: correct, red: incorrect, grey: skipped. Bar height is time spent.")
+            with col4:
+                st.markdown("<h5>By Topic</h5>", unsafe_allow_html=True)
+                st.markdown(artifacts["topics_svg"], unsafe_allow_html=True)
+
+            
+            st.write("---")
+            st.subheader("💡 Detailed Feedback")
+            for i, (q, ans, fb) in enumerate(zip(questions, answers, feedback)):
+                with st.expander(f"**Q{i+1}: {q['q']}**"):
+                    st.write(f"📝 **Your Answer:** {ans}")
+                    st.write(f"💬 **Feedback:** {fb}")
+                    ms = elapsed_ms[i] if i < len(elapsed_ms) else None
+                    if ms is not None:
+                        st.write(f"⏱️ **Time:** {ms / 1000:.1f}s")
+
+            # PDF Report Download
             st.download_button(
                 label="📥 Download PDF Report",
-                data=pdf_file,
+                data=artifacts["pdf"],
                 file_name="interview_report.pdf",
-                mime="application/octet-stream"
+                mime="application/pdf"
             )
+            timer.lap("summary_render")
+finally:
+    finish_rerun()
+
+# =========================
+# Rerun Timing
+# =========================
+if os.environ.get("SHOW_RERUN_TIMINGS"):
+    with st.sidebar.expander("⏱️ Rerun timings"):
+        st.code(timer.format())
+
+if profiler is not None:
+    with st.sidebar.expander(f"🔬 Profile ({profiler.samples} samples)"):
+        st.code("\n".join(f"{share:6.1%}  {frame}" for frame, share in profiler.top_functions()))
+        st.download_button("Download collapsed stacks", profiler.collapsed(), file_name="profile.folded")
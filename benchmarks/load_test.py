@@ -0,0 +1,263 @@
+"""
+Offline load test for the interview flow.
+
+Runs many complete interview sessions concurrently against the stub LLM
+provider (utils.llm.StubProvider) with a configurable latency, and reports
+p50/p95/p99 latency per phase, session throughput and peak RSS. Results can
+be recorded as a baseline and later runs are compared against it.
+
+Two drivers are available:
+- direct (default): calls get_interview_prompt / start_ai_interview, the answer
+  scoring path and utils.summary.build_summary_artifacts (the helper behind the
+  summary page: ranking, charts and PDF report) in-process;
+- apptest: drives app.py headlessly through streamlit.testing.v1.AppTest,
+  so every phase includes a full Streamlit rerun.
+
+    python -m benchmarks.load_test --sessions 200 --concurrency 20 --latency 0.5 --ai
+    python -m benchmarks.load_test --record
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE_PATH = os.path.join(ROOT_DIR, "benchmarks", "load_baseline.json")
+PHASES = ("question_fetch", "submit", "evaluate", "summary_render")
+SELECTIONS = [
+    ("Software Engineer", "Technical", "Standard"),
+    ("Software Engineer", "Behavioral", "Standard"),
+    ("Product Manager", "Technical", "Standard"),
+    ("Product Manager", "Behavioral", "Standard"),
+    ("Data Analyst", "Technical", "Standard"),
+    ("Data Analyst", "Behavioral", "Standard"),
+    ("Software Engineer", "Technical", "FAANG / MAANG"),
+]
+
+
+def configure_environment(args):
+    """
+    Points every LLM call at the stub and puts every cache and store in a fresh temp
+    directory, so runs never read the developer's data and are comparable. Must run before imports.
+    """
+    os.environ["LLM_PROVIDERS"] = "stub"
+    os.environ["LLM_STUB_LATENCY"] = str(args.latency)
+    os.environ["LLM_RATE_LIMIT"] = str(args.llm_rate)
+    scratch = tempfile.mkdtemp(prefix="interview-bot-load-")
+    os.environ["QUESTION_CACHE_PATH"] = os.path.join(scratch, "question_cache.sqlite3")
+    os.environ["QUESTION_BANK_PATH"] = os.path.join(scratch, "question_bank.sqlite3")
+    os.environ["RESULTS_STORE_PATH"] = os.path.join(scratch, "results")
+    os.environ["SEEN_STORE_PATH"] = os.path.join(scratch, "seen.sqlite3")
+    os.environ["SESSION_STORE"] = "memory"
+    os.environ["SESSION_STORE_PATH"] = os.path.join(scratch, "sessions.sqlite3")
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {phase: [] for phase in PHASES}
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds):
+        with self._lock:
+            self.samples[phase].append(seconds)
+
+    def fail(self):
+        with self._lock:
+            self.failures += 1
+
+
+class timed:
+    def __init__(self, recorder, phase):
+        self.recorder = recorder
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.recorder.add(self.phase, time.perf_counter() - self.started)
+
+
+def run_direct_session(args, recorder, rng):
+    from prompts import get_interview_prompt, start_ai_interview
+    from utils.evaluation import evaluate_batch
+    from utils.summary import build_summary_artifacts, interview_fingerprint
+    from utils.interview_state import NOT_ANSWERED, InterviewRecord, choice_index
+
+    role, mode, custom_set = rng.choice(SELECTIONS)
+    with timed(recorder, "question_fetch"):
+        if args.ai:
+            stream = start_ai_interview(role, mode, args.questions, custom_set)
+            stream.wait_for(1)
+        else:
+            questions, _ = get_interview_prompt(role, mode, args.questions, custom_set)
+    if args.ai:
+        stream.wait_for(args.questions)
+        questions = stream.questions
+
+    # Mirrors the Submit handler in app.py
+    interview = InterviewRecord(questions)
+    for i in range(interview.question_count):
+        if args.think_time:
+            time.sleep(args.think_time)
+        with timed(recorder, "submit"):
+            q = interview.question(i)
+            if q["options"]:
+                choice = rng.choice(q["options"])
+                interview.record(choice_index(q, choice), choice == q["answer"], 0)
+            else:
+                interview.record(NOT_ANSWERED, False, 0)
+    answers, feedback, score = interview.answers(), interview.feedback(), interview.score
+
+    scores = None
+    if args.evaluate:
+        with timed(recorder, "evaluate"):
+            evaluations = evaluate_batch([(q["q"], a) for q, a in zip(questions, answers)], mode)
+        scores = [evaluation.score for evaluation in evaluations]
+
+    # What the summary page computes on its first render, PDF report included
+    with timed(recorder, "summary_render"):
+        time_taken = rng.uniform(10, 60) * len(questions)
+        interview_fingerprint(questions, answers, feedback, score, time_taken)
+        build_summary_artifacts(
+            questions, answers, feedback, score, time_taken, mode, interview.elapsed_ms(), scores=scores,
+        )
+
+
+def run_apptest_session(args, recorder, rng):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT_DIR, "app.py"), default_timeout=120)
+    at.run()
+    if args.ai:
+        at.sidebar.toggle[0].set_value(True).run()
+    at.sidebar.slider[0].set_value(args.questions).run()
+
+    with timed(recorder, "question_fetch"):
+        at.sidebar.button[0].click().run()
+
+    for step in range(args.questions):
+        if args.think_time:
+            time.sleep(args.think_time)
+        radios = [r for r in at.radio if r.key == f"mcq_{step}"]
+        if not radios:
+            break
+        if radios[0].options:
+            radios[0].set_value(rng.choice(radios[0].options))
+        with timed(recorder, "submit" if step < args.questions - 1 else "summary_render"):
+            at.button(key=f"submit_{step}").click().run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(recorder, elapsed, sessions):
+    report = {"phases": {}, "sessions": sessions, "failures": recorder.failures}
+    for phase, samples in recorder.samples.items():
+        if not samples:
+            continue
+        values = sorted(samples)
+        report["phases"][phase] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+        }
+    report["throughput_sessions_per_s"] = (sessions - recorder.failures) / elapsed if elapsed else 0.0
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report["peak_rss_mb"] = max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    report["elapsed_s"] = elapsed
+    return report
+
+
+def _change(current, previous):
+    if not previous:
+        return ""
+    return f" ({(current - previous) / previous * 100:+.1f}%)"
+
+
+def print_report(report, baseline=None):
+    baseline = baseline or {}
+    base_phases = baseline.get("phases", {})
+    print(f"{'phase':<16}{'count':>7}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}")
+    for phase, stats in report["phases"].items():
+        line = f"{phase:<16}{stats['count']:>7}{stats['p50_ms']:>12.2f}{stats['p95_ms']:>12.2f}{stats['p99_ms']:>12.2f}"
+        if phase in base_phases:
+            line += f"   p95 vs baseline{_change(stats['p95_ms'], base_phases[phase]['p95_ms'])}"
+        print(line)
+    print(f"throughput: {report['throughput_sessions_per_s']:.2f} sessions/s"
+          f"{_change(report['throughput_sessions_per_s'], baseline.get('throughput_sessions_per_s'))}")
+    print(f"peak RSS:   {report['peak_rss_mb']:.1f} MB{_change(report['peak_rss_mb'], baseline.get('peak_rss_mb'))}")
+    print(f"failures:   {report['failures']}/{report['sessions']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the interview flow against a stub LLM.")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub LLM latency in seconds")
+    parser.add_argument("--llm-rate", type=float, default=0.0,
+                        help="LLM requests per second admitted across sessions (0: unlimited)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds a candidate spends per question")
+    parser.add_argument("--ai", action="store_true", help="Use AI-generated questions (served by the stub)")
+    parser.add_argument("--evaluate", action="store_true", help="Grade answers through the evaluation engine")
+    parser.add_argument("--driver", choices=("direct", "apptest"), default="direct")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--record", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--json", help="Also write the report to this path")
+    args = parser.parse_args(argv)
+
+    configure_environment(args)
+    run_session = run_apptest_session if args.driver == "apptest" else run_direct_session
+    recorder = Recorder()
+
+    def worker(index):
+        try:
+            run_session(args, recorder, random.Random(args.seed * 100003 + index))
+        except Exception as e:
+            recorder.fail()
+            print(f"session {index} failed: {e}", file=sys.stderr)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(worker, range(args.sessions)))
+    report = summarize(recorder, time.perf_counter() - started, args.sessions)
+    report["config"] = {k: v for k, v in vars(args).items() if k not in ("baseline", "record", "json")}
+
+    baseline = None
+    if not args.record and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print("note: baseline was recorded with a different configuration", file=sys.stderr)
+    print_report(report, baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.record:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Per-session memory of the interview state.
+
+Builds many finished interviews in two layouts and measures the memory they
+hold with tracemalloc:
+- lists: the previous layout, where every session keeps its own question dicts
+  (as returned by the bank) and parallel answer, feedback and elapsed-time lists;
+- compact: utils.interview_state.InterviewRecord, with question handles into the
+  shared registry and packed outcome arrays. The registry is reported separately,
+  since it is paid once per process rather than per session.
+
+    python -m benchmarks.session_memory --sessions 2000 --questions 10
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SELECTIONS = [
+    ("Software Engineer", "Technical", "Standard"),
+    ("Product Manager", "Behavioral", "Standard"),
+    ("Data Analyst", "Technical", "Standard"),
+    ("Software Engineer", "Technical", "FAANG / MAANG"),
+]
+
+
+def answer_session(questions, rng):
+    """Random answers for one interview: (choice text, correct, elapsed ms) per question."""
+    outcomes = []
+    for q in questions:
+        if q["options"] and rng.random() > 0.1:
+            choice = rng.choice(q["options"])
+            outcomes.append((choice, choice == q["answer"], rng.randint(2000, 90000)))
+        else:
+            outcomes.append(("Skipped", False, rng.randint(500, 5000)))
+    return outcomes
+
+
+def build_lists(questions, outcomes):
+    answers, feedback, elapsed_ms = [], [], []
+    for q, (choice, correct, ms) in zip(questions, outcomes):
+        answers.append(choice)
+        if choice == "Skipped":
+            feedback.append("Skipped")
+        else:
+            feedback.append("✅ Correct" if correct else f"❌ Incorrect (Correct Answer: {q['answer']})")
+        elapsed_ms.append(ms)
+    return {"questions": questions, "answers": answers, "feedback": feedback, "elapsed_ms": elapsed_ms}
+
+
+def build_compact(questions, outcomes):
+    from utils.interview_state import InterviewRecord, choice_index
+
+    record = InterviewRecord(questions)
+    for q, (choice, correct, ms) in zip(questions, outcomes):
+        record.record(choice_index(q, choice), correct, ms)
+    return record
+
+
+def measure(build):
+    """Returns (objects built, bytes they hold) for one call of build()."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return built, after - before
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-session memory of the interview state layouts.")
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("QUESTION_BANK_PATH", os.path.join(tempfile.mkdtemp(prefix="interview-bot-mem-"), "bank.sqlite3"))
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from utils.interview_state import get_question_registry
+    from utils.question_bank import get_question_bank, pool_name
+
+    bank = get_question_bank()
+    rng = random.Random(args.seed)
+    sessions = []
+    for _ in range(args.sessions):
+        role, mode, custom_set = rng.choice(SELECTIONS)
+        questions = bank.sample(pool_name(role, mode, custom_set), args.questions, rng)
+        sessions.append(([q["id"] for q in questions], answer_session(questions, rng)))
+
+    # Each session fetches its own question dicts from the bank, as the app does
+    _, lists_bytes = measure(lambda: [build_lists(bank.get(ids), outcomes) for ids, outcomes in sessions])
+    registry = get_question_registry()
+
+    def fill_registry():
+        for ids, _ in sessions:
+            for q in bank.get(ids):
+                registry.intern(q)
+
+    _, registry_bytes = measure(fill_registry)
+    _, compact_bytes = measure(lambda: [build_compact(bank.get(ids), outcomes) for ids, outcomes in sessions])
+
+    n = args.sessions
+    print(f"{n} sessions x {args.questions} questions ({len(registry)} distinct questions)")
+    print(f"{'layout':<10}{'per session':>14}{'total':>14}")
+    print(f"{'lists':<10}{lists_bytes / n:>12.0f} B{lists_bytes / 1024 / 1024:>11.2f} MB")
+    print(f"{'compact':<10}{compact_bytes / n:>12.0f} B{compact_bytes / 1024 / 1024:>11.2f} MB"
+          f"   + shared registry {registry_bytes / 1024:.1f} KB")
+    print(f"reduction: {(1 - compact_bytes / lists_bytes) * 100:.1f}% per session")
+
+
+if __name__ == "__main__":
+    main()
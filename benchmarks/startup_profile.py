@@ -0,0 +1,118 @@
+"""
+Import-time profile of the app's cold start.
+
+Each target is imported in a fresh interpreter with `python -X importtime`,
+repeated a few times, and the median cumulative import time is reported along
+with the heaviest individual modules. Results can be recorded as a baseline
+and later runs are compared against it.
+
+    python -m benchmarks.startup_profile --record    # store the baseline
+    python -m benchmarks.startup_profile             # compare with it
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE_PATH = os.path.join(ROOT_DIR, "benchmarks", "startup_baseline.json")
+
+# What a fresh Streamlit worker imports before the landing page can render,
+# followed by the heavy dependencies that should only load on demand.
+TARGETS = {
+    "landing_page": "import streamlit, dotenv, prompts",
+    "prompts": "import prompts",
+    "ai_sdk": "import google.generativeai",
+    "charts": "import utils.charts",
+    "plotly": "import plotly.graph_objects",
+    "report": "import utils.report",
+}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_target(statement, repeats):
+    """Returns (median cumulative ms, heaviest modules) for one import statement."""
+    totals = []
+    modules = {}
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            cwd=ROOT_DIR, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            last_line = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+            return None, [], last_line
+
+        total_us = 0
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+            self_us, cumulative_us, indent, name = match.groups()
+            # Top-level imports (no extra indentation) add up to the total
+            if len(indent) == 1:
+                total_us += int(cumulative_us)
+            modules.setdefault(name, []).append(int(self_us))
+        totals.append(total_us / 1000)
+
+    heaviest = sorted(
+        ((name, statistics.median(samples) / 1000) for name, samples in modules.items()),
+        key=lambda item: item[1], reverse=True,
+    )[:10]
+    return statistics.median(totals), heaviest, None
+
+
+def run_profile(repeats):
+    report = {}
+    for name, statement in TARGETS.items():
+        total_ms, heaviest, error = profile_target(statement, repeats)
+        report[name] = {
+            "statement": statement,
+            "total_ms": total_ms,
+            "heaviest": [[module, round(ms, 2)] for module, ms in heaviest],
+            "error": error,
+        }
+    return report
+
+
+def print_report(report, baseline=None):
+    for name, entry in report.items():
+        if entry["error"]:
+            print(f"{name:<14} failed: {entry['error']}")
+            continue
+        line = f"{name:<14} {entry['total_ms']:>9.1f} ms"
+        previous = (baseline or {}).get(name, {}).get("total_ms")
+        if previous:
+            change = (entry["total_ms"] - previous) / previous * 100
+            line += f"   baseline {previous:>9.1f} ms ({change:+.1f}%)"
+        print(line)
+        for module, ms in entry["heaviest"][:5]:
+            print(f"    {ms:>9.2f} ms  {module}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the app's import-time cold start.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--record", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    report = run_profile(args.repeats)
+    baseline = None
+    if not args.record and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.record:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Caches and stores live in a scratch directory, and every LLM call goes to the stub provider
+_scratch = tempfile.mkdtemp(prefix="interview-bot-tests-")
+os.environ["LLM_PROVIDERS"] = "stub"
+os.environ["LLM_STUB_LATENCY"] = "0"
+for _name, _file in (
+    ("QUESTION_BANK_PATH", "question_bank.sqlite3"),
+    ("QUESTION_CACHE_PATH", "question_cache.sqlite3"),
+    ("SESSION_STORE_PATH", "sessions.sqlite3"),
+    ("SEEN_STORE_PATH", "seen.sqlite3"),
+    ("RESULTS_STORE_PATH", "results"),
+):
+    os.environ[_name] = os.path.join(_scratch, _file)
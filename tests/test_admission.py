@@ -0,0 +1,116 @@
+import threading
+import time
+
+from utils.admission import AdmissionController, SingleFlight
+
+
+def test_do_coalesces_concurrent_calls():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return "questions"
+
+    def caller():
+        results.append(flights.do("key", fn))
+
+    threads = [threading.Thread(target=caller) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while not calls:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert {result for result, _ in results} == {"questions"}
+    # Once the call has finished, the next one runs again
+    assert flights.do("key", lambda: "again") == ("again", False)
+
+
+def test_do_shares_exceptions():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def fn():
+        started.set()
+        release.wait(5)
+        raise ValueError("provider down")
+
+    def caller():
+        try:
+            flights.do("key", fn)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=caller)
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    follower.join()
+    assert errors == ["provider down", "provider down"]
+
+
+class Handle:
+    def __init__(self):
+        self.done = False
+
+
+def test_share_reuses_running_handles_and_drops_finished_ones():
+    flights = SingleFlight()
+    running = lambda handle: not handle.done
+
+    first, shared = flights.share("a", Handle, running)
+    assert not shared
+    assert flights.share("a", Handle, running) == (first, True)
+
+    first.done = True
+    second, shared = flights.share("a", Handle, running)
+    assert second is not first and not shared
+
+    second.done = True
+    flights.share("b", Handle, running)
+    assert list(flights._handles) == ["b"]
+
+
+def test_admission_sheds_callers_beyond_the_queue():
+    controller = AdmissionController(rate=5, burst=1, max_wait=2, max_queue=1)
+    assert controller.admit()
+
+    # The next token arrives in 0.2s; one caller may queue for it, a second one is turned away
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(controller.admit()))
+    waiter.start()
+    deadline = time.monotonic() + 2
+    while not controller._waiting and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert controller.admit() is False
+    waiter.join()
+    assert results == [True]
+
+
+def test_admission_times_out_when_no_token_arrives_before_the_deadline():
+    controller = AdmissionController(rate=0.1, burst=1, max_wait=10, max_queue=5)
+    assert controller.admit()
+    started = time.monotonic()
+    assert controller.admit(deadline=time.monotonic() + 0.05) is False
+    assert time.monotonic() - started < 1
+    assert controller.try_admit() is False
+
+
+def test_zero_rate_disables_admission_control():
+    controller = AdmissionController(rate=0, max_queue=0)
+    assert all(controller.admit() for _ in range(100))
+    assert controller.try_admit()
@@ -0,0 +1,29 @@
+
+from utils.cohort_export import build_jobs, select_sessions
+from utils.results_store import ResultsStore
+
+META = {"role": "Data Analyst", "mode": "Technical", "custom_set": "Standard"}
+
+
+def test_build_jobs_reads_attempts_one_chunk_at_a_time(tmp_path):
+    store = ResultsStore(str(tmp_path), compact_threshold=1000)
+    questions = [{"q": "Q1?"}, {"q": "Q2?"}]
+    outcomes = [{"correct": True, "skipped": False, "elapsed_ms": 1200}, {"correct": False, "skipped": True}]
+    for i in range(7):
+        store.record_interview(f"s{i}", f"user{i % 2}", META, questions, outcomes, 20.0, finished_at=1000.0 + i)
+
+    requested = []
+
+    def read_attempts(session_ids):
+        requested.append(list(session_ids))
+        return store.read_attempts(session_ids)
+
+    cohort = select_sessions(store.session_frame(), users=["user0"])
+    jobs = build_jobs(cohort, read_attempts, {}, skip={"s2"}, chunk_size=2)
+    first = next(jobs)
+    assert requested == [["s0", "s4"]]
+    rest = list(jobs)
+
+    assert [job["session_id"] for job in [first] + rest] == ["s0", "s4", "s6"]
+    assert requested == [["s0", "s4"], ["s6"]]
+    assert first["answers"] == ["Answered in 1.2s", "Skipped"]
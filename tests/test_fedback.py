@@ -0,0 +1,18 @@
+from utils.fedback import parse_evaluation
+
+
+def test_plain_reply():
+    assert parse_evaluation("Feedback: Clear and correct.\nScore: 8") == ("Clear and correct.", 8)
+
+
+def test_bold_labels():
+    assert parse_evaluation("**Feedback:** good job\n**Score:** 8/10") == ("good job", 8)
+
+
+def test_score_is_clamped_and_defaults_to_five():
+    assert parse_evaluation("Feedback: Great.\nScore: 14") == ("Great.", 10)
+    assert parse_evaluation("Feedback: No score given.") == ("No score given.", 5)
+
+
+def test_reply_without_feedback_label_uses_text_before_score():
+    assert parse_evaluation("Solid answer overall.\nScore: 7") == ("Solid answer overall.", 7)
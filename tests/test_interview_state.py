@@ -0,0 +1,41 @@
+from utils.interview_state import LOCAL_HANDLE, InterviewRecord, get_question_registry
+
+BANK_QUESTION = {"id": "bank-test-1", "q": "What does SQL stand for?", "options": ["a", "b", "c", "d"], "answer": "a"}
+
+
+def ai_question(answer="Hash map"):
+    return {"q": "Which structure gives O(1) lookups?", "options": ["Hash map", "List", "Heap", "Trie"], "answer": answer}
+
+
+def test_bank_questions_are_shared_through_the_registry():
+    first, second = InterviewRecord([BANK_QUESTION]), InterviewRecord([dict(BANK_QUESTION)])
+    assert first.handles[0] == second.handles[0]
+    assert not first.handles[0] & LOCAL_HANDLE
+    assert first.question(0) is second.question(0)
+
+
+def test_ai_questions_stay_in_the_session():
+    registered = len(get_question_registry())
+    record = InterviewRecord([BANK_QUESTION, ai_question()])
+    assert len(get_question_registry()) == registered
+    assert record.handles[1] & LOCAL_HANDLE
+    assert [q["q"] for q in record.questions()] == [BANK_QUESTION["q"], ai_question()["q"]]
+    assert record.local == [dict(ai_question(), options=tuple(ai_question()["options"]))]
+
+
+def test_same_text_with_different_answer_keeps_its_own_answer():
+    first = InterviewRecord([ai_question("Hash map")])
+    second = InterviewRecord([ai_question("Trie")])
+    assert second.question(0)["answer"] == "Trie"
+    assert first.question(0)["answer"] == "Hash map"
+
+    edited = dict(BANK_QUESTION, answer="b")
+    assert InterviewRecord([edited]).question(0)["answer"] == "b"
+    assert InterviewRecord([BANK_QUESTION]).question(0)["answer"] == "a"
+
+
+def test_answers_and_feedback_render_from_local_questions():
+    record = InterviewRecord([ai_question()])
+    record.record(3, False, 1500)
+    assert record.answers() == ["Trie"]
+    assert record.feedback() == ["❌ Incorrect (Correct Answer: Hash map)"]
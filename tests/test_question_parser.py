@@ -0,0 +1,42 @@
+from utils.question_parser import parse_questions, validate_question
+
+OPTIONS = ["Hash map", "Linked list", "Binary heap", "Trie"]
+
+
+def item(answer):
+    return {"q": "Which structure gives O(1) average lookup by key?", "options": list(OPTIONS), "answer": answer}
+
+
+def test_exact_answer_is_kept():
+    question, reason = validate_question(item("Hash map"))
+    assert reason is None
+    assert question["answer"] == "Hash map"
+
+
+def test_answer_differing_in_case_and_spacing_maps_to_option():
+    question, _ = validate_question(item("  binary   HEAP "))
+    assert question["answer"] == "Binary heap"
+
+
+def test_bare_letter_answers_map_to_option():
+    for answer in ("B", "(B)", "B.", "B)", "b:"):
+        question, reason = validate_question(item(answer))
+        assert reason is None, answer
+        assert question["answer"] == "Linked list"
+
+
+def test_answer_starting_with_a_word_a_is_rejected():
+    question, reason = validate_question(item("A balanced tree"))
+    assert question is None
+    assert reason == "answer does not match any option"
+
+
+def test_letter_followed_by_text_is_rejected():
+    question, _ = validate_question(item("B) Something else"))
+    assert question is None
+
+
+def test_parse_salvages_valid_items_from_truncated_reply():
+    reply = '```json\n[{"q": "Q1?", "options": ["a", "b", "c", "d"], "answer": "a"}, {"q": "Q2?", "opt'
+    questions, problems = parse_questions(reply)
+    assert [q["q"] for q in questions] == ["Q1?"]
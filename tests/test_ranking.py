@@ -0,0 +1,24 @@
+from utils.ranking import RankingEngine, composite_score
+from utils.results_store import ResultsStore
+
+META = {"role": "Software Engineer", "mode": "Technical", "custom_set": "Standard"}
+QUESTIONS = [{"q": f"Question {i}?", "difficulty": 2} for i in range(4)]
+
+
+def outcomes(correct):
+    return [{"correct": i < correct, "skipped": False, "elapsed_ms": 30000} for i in range(len(QUESTIONS))]
+
+
+def test_interview_is_not_ranked_against_itself(tmp_path):
+    store = ResultsStore(str(tmp_path), compact_threshold=1000)
+    for i in range(40):
+        store.record_interview(f"past{i}", "u", META, QUESTIONS, outcomes(i % 4), 120.0)
+    engine = RankingEngine(store)
+    score = composite_score([True] * 4, [2] * 4, [30.0] * 4, 120.0)
+    before = engine.percentile(score, "Technical")
+
+    store.record_interview("me", "u", META, QUESTIONS, outcomes(4), 120.0)
+    assert engine.percentile(score, "Technical") != before
+    assert engine.percentile(score, "Technical", session_id="me") == before
+    # Falls back to the overall population the same way
+    assert engine.percentile(score, "Behavioral", session_id="me") == before
@@ -0,0 +1,114 @@
+import os
+import threading
+
+from utils.results_store import ResultsStore
+
+META = {"role": "Software Engineer", "mode": "Technical", "custom_set": "Standard"}
+QUESTIONS = [{"q": f"Question {i}?", "difficulty": 2} for i in range(3)]
+
+
+def record(store, n, prefix="s"):
+    outcomes = [{"correct": True, "skipped": False, "elapsed_ms": 1000}] * len(QUESTIONS)
+    for i in range(n):
+        store.record_interview(f"{prefix}{i}", "u1", META, QUESTIONS, outcomes, 30.0, finished_at=1000.0 + i)
+
+
+def test_concurrent_compactions_do_not_duplicate_rows(tmp_path):
+    path = str(tmp_path)
+    record(ResultsStore(path, compact_threshold=1000), 20)
+    stores = [ResultsStore(path) for _ in range(4)]
+    threads = [threading.Thread(target=store.compact) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reader = ResultsStore(path)
+    assert len(reader.session_frame()) == 20
+    assert len(reader.attempts_frame()) == 60
+    assert reader.question_stats_frame()["attempts"].tolist() == [20, 20, 20]
+    assert len(reader.attempts.parts()) == 1
+
+
+def test_compaction_leaves_large_parts_alone(tmp_path):
+    path = str(tmp_path)
+    store = ResultsStore(path, compact_threshold=1000)
+    record(store, 5)
+    store.compact()
+    (large,) = store.attempts.parts()
+
+    store.compact_part_bytes = os.path.getsize(os.path.join(store.attempts.path, large))
+    record(store, 5, prefix="t")
+    store.compact()
+    parts = store.attempts.parts()
+    assert large in parts and len(parts) == 2
+    assert len(store.attempts_frame()) == 30
+
+
+def test_readers_skip_parts_replaced_by_a_published_merge(tmp_path):
+    store = ResultsStore(str(tmp_path), compact_threshold=1000)
+    record(store, 3)
+    names = store.sessions.parts()
+    # A merged part published, its sources not yet deleted, as a crash mid-compaction would leave it
+    merged = store.session_frame()
+    finish = store.sessions._finish_replace
+    store.sessions._finish_replace = lambda sources_name: None
+    store.sessions.replace(names, merged)
+    store.sessions._finish_replace = finish
+
+    assert len(ResultsStore(str(tmp_path)).session_frame()) == 3
+    store.compact()
+    assert sorted(os.listdir(store.sessions.path)) == store.sessions.parts()
+    assert len(ResultsStore(str(tmp_path)).session_frame()) == 3
+
+
+def test_record_interview_compacts_in_the_background(tmp_path):
+    store = ResultsStore(str(tmp_path), compact_threshold=4)
+    record(store, 6)
+    for thread in threading.enumerate():
+        if thread.name == "results-compaction":
+            thread.join()
+    assert len(store.attempts.parts()) < 6
+    assert len(store.attempts_frame()) == 18
+
+
+def test_read_attempts_returns_only_the_requested_sessions(tmp_path):
+    store = ResultsStore(str(tmp_path), compact_threshold=1000)
+    record(store, 6)
+    store.compact()
+    record(store, 2, prefix="t")
+
+    attempts = store.read_attempts(["s1", "t0"])
+    assert sorted(set(attempts["session_id"])) == ["s1", "t0"]
+    assert len(attempts) == 6
+    assert store.read_attempts(["missing"]).empty
+
+
+def test_cached_frames_fold_in_only_new_parts(tmp_path, monkeypatch):
+    import utils.results_store as results_store
+
+    store = ResultsStore(str(tmp_path), compact_threshold=1000)
+    record(store, 3)
+    assert len(store.session_frame()) == 3
+
+    folded = []
+    append_frames = results_store._append_frames
+    monkeypatch.setattr(
+        results_store, "_append_frames", lambda value, frames: folded.append(len(frames)) or append_frames(value, frames)
+    )
+    record(store, 2, prefix="t")
+    assert len(store.session_frame()) == 5
+    # Only the two parts written since the last read, not all five
+    assert folded == [2]
+
+
+def test_session_index_survives_compaction(tmp_path):
+    store = ResultsStore(str(tmp_path), compact_threshold=1000)
+    record(store, 4)
+    assert store.has_session("s3") and not store.has_session("x")
+    assert store.session_index()["s0"][0] == "Technical"
+    store.compact()
+    record(store, 1, prefix="t")
+    assert set(store.session_index()) == {"s0", "s1", "s2", "s3", "t0"}
+    assert not store.record_interview("s1", "u1", META, QUESTIONS, [], 1.0)
+    assert len(store.session_frame()) == 5
@@ -0,0 +1,34 @@
+from utils.seen import NearDuplicateFilter, dedupe_questions
+
+
+def admitted(first, second):
+    near_duplicates = NearDuplicateFilter()
+    assert near_duplicates.admit(first)
+    return near_duplicates.admit(second)
+
+
+def test_questions_differing_in_their_key_term_are_both_kept():
+    assert admitted(
+        "What is the difference between a list and a set in Python?",
+        "What is the difference between a list and a tuple in Python?",
+    )
+    assert admitted("How does garbage collection work in Java?", "How does garbage collection work in Python?")
+
+
+def test_rephrased_question_is_rejected():
+    assert not admitted(
+        "Explain the difference between a list and a tuple in Python.",
+        "What is the difference between a list and a tuple in Python?",
+    )
+    assert not admitted("What is a REST API?", "what is a REST API")
+
+
+def test_dedupe_questions_keeps_the_first_of_each_group():
+    questions = [
+        {"q": "What is a primary key in SQL?"},
+        {"q": "What is a primary key in SQL"},
+        {"q": "What is a foreign key in SQL?"},
+    ]
+    assert [q["q"] for q in dedupe_questions(questions)] == [
+        "What is a primary key in SQL?", "What is a foreign key in SQL?",
+    ]
@@ -0,0 +1,88 @@
+import pytest
+
+from prompts import get_adaptive_scheduler, next_adaptive_question, resume_interview_questions
+from utils.session_store import MemorySessionStore, RedisSessionStore, SQLiteSessionStore
+
+META = {
+    "role": "Software Engineer", "mode": "Technical", "custom_set": "Standard", "num_qs": 8,
+    "use_ai": False, "adaptive": True, "user_id": None, "started_at": 0.0,
+}
+
+
+class AdaptiveSession:
+    """Mirrors how app.py checkpoints an adaptive interview: each answer stores the questions added since the last one."""
+
+    def __init__(self, store, session_id, questions, scheduler):
+        self.store = store
+        self.session_id = session_id
+        self.questions = questions
+        self.scheduler = scheduler
+        self.saved_questions = len(questions)
+        self.answered = 0
+
+    @classmethod
+    def start(cls, store, session_id):
+        scheduler = get_adaptive_scheduler(META["role"], META["mode"], META["custom_set"])
+        questions = [next_adaptive_question(scheduler)]
+        store.create(session_id, META, questions)
+        return cls(store, session_id, questions, scheduler)
+
+    @classmethod
+    def restore(cls, store, session_id):
+        saved = store.load(session_id)
+        questions, scheduler = resume_interview_questions(store, session_id, saved)
+        session = cls(store, session_id, questions, scheduler)
+        session.answered = len(saved["answers"])
+        return session
+
+    def answer(self, correct):
+        step = self.answered
+        if len(self.questions) > self.saved_questions:
+            self.store.add_questions(self.session_id, self.questions, self.saved_questions)
+            self.saved_questions = len(self.questions)
+        self.store.append_answer(self.session_id, step, {"i": 0, "c": int(correct), "ms": 1000, "t": 0.0})
+        self.answered += 1
+        self.scheduler.record(correct)
+        if len(self.questions) < META["num_qs"]:
+            self.questions.append(next_adaptive_question(self.scheduler))
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionStore()
+    if request.param == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        return RedisSessionStore(client=fakeredis.FakeRedis())
+    return SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+
+
+def test_restore_answer_restore_keeps_questions_and_answers_aligned(store):
+    session = AdaptiveSession.start(store, "sid")
+    for correct in (True, True, False):
+        session.answer(correct)
+    asked = [q["id"] for q in session.questions[:3]]
+
+    session = AdaptiveSession.restore(store, "sid")
+    assert len(session.questions) == 4
+    for correct in (True, False):
+        session.answer(correct)
+    asked += [q["id"] for q in session.questions[3:5]]
+
+    saved = store.load("sid")
+    assert [q["id"] for q in saved["questions"]] == asked
+    assert len(saved["answers"]) == 5
+
+    session = AdaptiveSession.restore(store, "sid")
+    assert [q["id"] for q in session.questions[:5]] == asked
+    assert len(session.questions) == 6
+    assert [q["id"] for q in store.load("sid")["questions"]] == [q["id"] for q in session.questions]
+
+
+def test_restore_persists_the_question_it_picks(store):
+    session = AdaptiveSession.start(store, "sid")
+    session.answer(True)
+
+    restored = AdaptiveSession.restore(store, "sid")
+    stored = store.load("sid")["questions"]
+    assert [q["id"] for q in stored] == [q["id"] for q in restored.questions]
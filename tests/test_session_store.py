@@ -0,0 +1,62 @@
+import pytest
+
+from utils.session_store import MemorySessionStore, RedisSessionStore, SQLiteSessionStore
+
+META = {"role": "Data Analyst", "mode": "Technical", "custom_set": "Standard", "num_qs": 3, "user_id": "u1"}
+QUESTIONS = [{"q": f"Question {i}?", "options": ["a", "b"], "answer": "a"} for i in range(3)]
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionStore()
+    if request.param == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        return RedisSessionStore(client=fakeredis.FakeRedis())
+    return SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+
+
+def test_round_trip_keeps_answers_in_question_order(store):
+    store.create("sid", META, QUESTIONS[:1])
+    store.add_questions("sid", QUESTIONS, 1)
+    store.append_answer("sid", 1, {"i": 1, "c": 0})
+    store.append_answer("sid", 0, {"i": 0, "c": 1})
+    store.append_answer("sid", 1, {"i": 0, "c": 1})
+
+    saved = store.load("sid")
+    assert saved["meta"] == META
+    assert saved["questions"] == QUESTIONS
+    assert saved["answers"] == [{"i": 0, "c": 1}, {"i": 0, "c": 1}]
+
+
+def test_add_questions_replaces_everything_from_start(store):
+    store.create("sid", META, QUESTIONS)
+    replacement = {"q": "Replacement?", "options": [], "answer": ""}
+    store.add_questions("sid", QUESTIONS[:1] + [replacement], 1)
+    assert store.load("sid")["questions"] == [QUESTIONS[0], replacement]
+
+
+def test_writes_to_unknown_sessions_are_ignored(store):
+    store.add_questions("missing", QUESTIONS, 0)
+    store.append_answer("missing", 0, {"i": 0, "c": 1})
+    assert store.load("missing") is None
+
+
+def test_create_and_delete(store):
+    store.create("sid", META, QUESTIONS)
+    store.append_answer("sid", 0, {"i": 0, "c": 1})
+    store.create("sid", META, [])
+    assert store.load("sid") == {"meta": META, "questions": [], "answers": []}
+
+    store.delete("sid")
+    assert store.load("sid") is None
+
+
+def test_redis_keys_expire_together():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    store = RedisSessionStore(client=client, ttl=60)
+    store.create("sid", META, QUESTIONS)
+    store.append_answer("sid", 0, {"i": 0, "c": 1})
+    for key in store._keys("sid"):
+        assert 0 < client.ttl(key) <= 60
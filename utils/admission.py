@@ -0,0 +1,149 @@
+"""
+Request coalescing and admission control for LLM calls.
+
+SingleFlight merges concurrent identical requests (e.g. many sessions starting
+the same role/mode at once) into one call whose result they all share.
+
+AdmissionController is a process-wide budget for requests to the provider,
+shared by every session. Requests over budget queue for a token until their
+deadline and are then turned away, so the caller can degrade to cached or
+preset questions instead of running into provider rate limits.
+
+Configured from the environment:
+    LLM_RATE_LIMIT       requests per second (default 2; 0 disables the limit)
+    LLM_BURST            requests allowed in a burst (default 10)
+    LLM_ADMISSION_WAIT   seconds a request may queue for a token (default 5)
+    LLM_ADMISSION_QUEUE  requests allowed to queue at once (default 50)
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from utils import metrics
+from utils.rate_limit import TokenBucket
+
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 10
+DEFAULT_MAX_WAIT = 5.0
+DEFAULT_MAX_QUEUE = 50
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into a single call."""
+
+    def __init__(self):
+        self._calls = {}
+        self._handles = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """
+        Runs fn() unless a call for `key` is already in flight, in which case waits
+        for that call instead. Returns (result, shared); exceptions are shared too.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return result, False
+
+    def share(self, key, start, running):
+        """
+        For work that outlives the call, such as a stream consumed in the background:
+        returns (handle, shared), reusing the handle for `key` while running(handle)
+        is true and creating one with start() otherwise. Finished handles are
+        dropped whenever a new one is started, so keys do not pile up.
+        """
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None and running(handle):
+                return handle, True
+            for stale in [k for k, h in self._handles.items() if not running(h)]:
+                del self._handles[stale]
+            handle = self._handles[key] = start()
+            return handle, False
+
+
+class AdmissionController:
+    """
+    Token bucket of `rate` requests per second with bursts of up to `burst`.
+    At most `max_queue` callers wait for a token at once; the rest are turned
+    away immediately, so a spike cannot build an unbounded backlog.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_wait=DEFAULT_MAX_WAIT, max_queue=DEFAULT_MAX_QUEUE):
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def deadline(self):
+        """The latest time (time.monotonic()) a request starting now should wait until."""
+        return time.monotonic() + self.max_wait
+
+    def try_admit(self):
+        """Admits only if a token is free right now; for background work that must not hold up users."""
+        admitted = self.bucket is None or self.bucket.try_acquire()
+        metrics.inc("llm_admission_total", result="admitted" if admitted else "rejected", priority="background")
+        return admitted
+
+    def admit(self, deadline=None):
+        """
+        Waits for a token until `deadline` (default: max_wait from now).
+        Returns False straight away if the token cannot arrive in time or the queue is full.
+        """
+        if self.bucket is None or self.bucket.try_acquire():
+            metrics.inc("llm_admission_total", result="admitted", priority="interactive")
+            return True
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                metrics.inc("llm_admission_total", result="shed", priority="interactive")
+                return False
+            self._waiting += 1
+
+        started = time.monotonic()
+        if deadline is None:
+            deadline = started + self.max_wait
+        try:
+            admitted = self.bucket.acquire(timeout=max(0.0, deadline - started))
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        metrics.observe("llm_admission_wait_seconds", time.monotonic() - started)
+        metrics.inc("llm_admission_total", result="admitted" if admitted else "timed_out", priority="interactive")
+        return admitted
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller():
+    """Returns the process-wide admission controller, configured from environment variables."""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController(
+                    rate=float(os.environ.get("LLM_RATE_LIMIT", DEFAULT_RATE)),
+                    burst=int(os.environ.get("LLM_BURST", DEFAULT_BURST)),
+                    max_wait=float(os.environ.get("LLM_ADMISSION_WAIT", DEFAULT_MAX_WAIT)),
+                    max_queue=int(os.environ.get("LLM_ADMISSION_QUEUE", DEFAULT_MAX_QUEUE)),
+                )
+    return _controller
@@ -0,0 +1,141 @@
+"""
+Two-tier cache for answer evaluations.
+
+Tier 1 is an exact match on the normalized (question, answer, mode).
+Tier 2 (optional) finds answers to the same question whose MinHash similarity
+is above a threshold. Both tiers share one LRU bound.
+
+Lookups are exported as answer_cache_requests_total{result="exact_hit"|"similar_hit"|"miss"},
+the model latency they avoided as answer_cache_saved_seconds_total, and LRU
+evictions as answer_cache_evictions_total.
+
+Configured from the environment:
+    ANSWER_CACHE_SIZE        maximum number of cached evaluations (default 2048, 0 disables)
+    ANSWER_CACHE_SIMILARITY  similarity threshold for tier 2 (default 0.8, 0 disables tier 2)
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from utils import metrics
+from utils.minhash import LSHIndex, MinHasher, normalize_text
+
+
+class AnswerCache:
+    def __init__(self, max_entries=2048, similarity_threshold=0.8, num_perm=64, bands=16):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._hasher = MinHasher(num_perm=num_perm) if similarity_threshold else None
+        self._index = LSHIndex(num_perm=num_perm, bands=bands) if similarity_threshold else None
+        self._entries = OrderedDict()  # exact key -> (result, latency, signature, group)
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def _group(question, mode):
+        return hashlib.sha256(f"{normalize_text(question)}\0{mode}".encode()).hexdigest()
+
+    @staticmethod
+    def _exact_key(group, answer):
+        return hashlib.sha256(f"{group}\0{normalize_text(answer)}".encode()).hexdigest()
+
+    def get(self, question, answer, mode):
+        """Returns the cached (feedback, score) for this answer or a near-identical one, or None."""
+        group = self._group(question, mode)
+        key = self._exact_key(group, answer)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                self.saved_seconds += entry[1]
+        if entry is not None:
+            self._count("exact_hit", entry[1])
+            return entry[0]
+
+        if self._hasher is not None:
+            signature = self._hasher.signature(answer)
+            with self._lock:
+                best_key, best_similarity = None, 0.0
+                for candidate in self._index.candidates(signature, namespace=group):
+                    candidate_entry = self._entries.get(candidate)
+                    if candidate_entry is None:
+                        continue
+                    similarity = MinHasher.similarity(signature, candidate_entry[2])
+                    if similarity > best_similarity:
+                        best_key, best_similarity = candidate, similarity
+                entry = None
+                if best_key is not None and best_similarity >= self.similarity_threshold:
+                    entry = self._entries[best_key]
+                    self._entries.move_to_end(best_key)
+                    self.similar_hits += 1
+                    self.saved_seconds += entry[1]
+            if entry is not None:
+                self._count("similar_hit", entry[1])
+                return entry[0]
+
+        with self._lock:
+            self.misses += 1
+        self._count("miss")
+        return None
+
+    @staticmethod
+    def _count(result, saved_seconds=0.0):
+        metrics.inc("answer_cache_requests_total", result=result)
+        if saved_seconds:
+            metrics.inc("answer_cache_saved_seconds_total", saved_seconds)
+
+    def put(self, question, answer, mode, result, latency=0.0):
+        if self.max_entries <= 0:
+            return
+        group = self._group(question, mode)
+        key = self._exact_key(group, answer)
+        signature = self._hasher.signature(answer) if self._hasher is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = (result, latency, signature, group)
+            if signature is not None:
+                self._index.add(key, signature, namespace=group)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                old_key, (_, _, old_signature, old_group) = self._entries.popitem(last=False)
+                if old_signature is not None:
+                    self._index.remove(old_key, old_signature, namespace=old_group)
+                evicted += 1
+        if evicted:
+            metrics.inc("answer_cache_evictions_total", evicted)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.exact_hits + self.similar_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.similar_hits) / lookups if lookups else 0.0,
+                "saved_seconds": self.saved_seconds,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    """Returns the process-wide answer cache, configured from environment variables."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnswerCache(
+                    max_entries=int(os.environ.get("ANSWER_CACHE_SIZE", 2048)),
+                    similarity_threshold=float(os.environ.get("ANSWER_CACHE_SIMILARITY", 0.8)),
+                )
+    return _cache
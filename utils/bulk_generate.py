@@ -0,0 +1,241 @@
+"""
+Offline pipeline that mass-generates AI questions for the question bank.
+
+Stages are chained generators, so questions flow through one batch at a time:
+    plan_jobs      -> which pool to request a batch for next, until each pool reaches its target
+    run_jobs       -> concurrent, rate-limited calls to prompts.generate_ai_interview_questions
+    to_records     -> bank records (set, role, mode, difficulty, tags) from validated questions
+    dedupe_records -> drops exact and near-duplicate questions, including ones already in the bank
+    write_records  -> appends JSONL, flushed after every batch
+
+The JSONL output is the checkpoint: rerunning the same command resumes where
+it stopped, counting (and deduplicating against) what is already in the file.
+With --ingest the output is imported into the bank through
+utils.question_bank.import_questions.
+
+    python -m utils.bulk_generate out.jsonl --per-pool 500 --workers 8 --rate 2
+    python -m utils.bulk_generate out.jsonl --pool "Data Analyst/Technical" --per-pool 1000 --ingest
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dotenv import load_dotenv
+
+from utils.question_bank import (
+    DEFAULT_BANK_PATH, DEFAULT_SOURCE_PATH, get_question_bank, import_questions, pool_name, read_jsonl,
+)
+from utils.rate_limit import TokenBucket
+from utils.seen import NearDuplicateFilter
+
+# Same defaults app.py uses for custom sets, and the difficulty convention of data/questions.jsonl
+CUSTOM_SET_ROLE, CUSTOM_SET_MODE = "Software Engineer", "Technical"
+DIFFICULTY = {"Behavioral": 1, "Technical": 2}
+CUSTOM_SET_DIFFICULTY = 3
+
+
+def parse_pool(pool):
+    """Maps a bank pool name back to (role, mode, custom_set)."""
+    if "/" in pool:
+        role, mode = pool.split("/", 1)
+        return role, mode, "Standard"
+    return CUSTOM_SET_ROLE, CUSTOM_SET_MODE, pool
+
+
+class Progress:
+    """Accepted questions per pool (recounted from the output on start), plus this run's requests."""
+
+    def __init__(self, output_path):
+        self.accepted = {}
+        self.requested = {}
+        self.in_flight = {}
+        if os.path.exists(output_path):
+            for record in read_jsonl(output_path):
+                pool = pool_name(record["role"], record["mode"], record["set"])
+                self.accepted[pool] = self.accepted.get(pool, 0) + 1
+
+
+def plan_jobs(pools, per_pool, batch_size, progress, max_batch_factor=3):
+    """
+    Yields the pool to request a batch for, until every pool has `per_pool` accepted
+    questions. Runs lazily, so each decision sees the batches already written, and
+    batches still in flight count towards the target; None means "wait for results".
+    A pool stops after `max_batch_factor` times the batches it needed at the start,
+    so a model that keeps repeating itself cannot stall the run.
+    """
+    max_batches = {
+        pool: max_batch_factor * math.ceil(max(per_pool - progress.accepted.get(pool, 0), 0) / batch_size)
+        for pool in pools
+    }
+    active = list(pools)
+    while active:
+        issued = False
+        for pool in list(active):
+            accepted = progress.accepted.get(pool, 0)
+            if accepted >= per_pool or progress.requested.get(pool, 0) >= max_batches[pool]:
+                if not progress.in_flight.get(pool):
+                    active.remove(pool)
+                continue
+            if accepted + progress.in_flight.get(pool, 0) * batch_size >= per_pool:
+                continue
+            progress.requested[pool] = progress.requested.get(pool, 0) + 1
+            progress.in_flight[pool] = progress.in_flight.get(pool, 0) + 1
+            issued = True
+            yield pool
+        if active and not issued:
+            yield None
+
+
+def run_jobs(jobs, generate, batch_size, workers, bucket):
+    """
+    Runs jobs concurrently with at most `workers` in flight; yields (pool, questions, error) as they finish.
+    A None job means the planner is waiting on results, so no new job is submitted until one completes.
+    """
+    def call(pool):
+        bucket.acquire()
+        role, mode, custom_set = parse_pool(pool)
+        return generate(role, mode, batch_size, custom_set)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-generate") as executor:
+        pending = {}
+        jobs = iter(jobs)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < workers:
+                pool = next(jobs, StopIteration)
+                if pool is StopIteration:
+                    exhausted = True
+                    break
+                if pool is None:
+                    break
+                pending[executor.submit(call, pool)] = pool
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pool = pending.pop(future)
+                try:
+                    questions, error = future.result()
+                except Exception as e:
+                    questions, error = None, str(e)
+                yield pool, questions or [], error
+
+
+def to_records(results):
+    """Turns validated questions into question-bank records."""
+    for pool, questions, error in results:
+        role, mode, custom_set = parse_pool(pool)
+        difficulty = CUSTOM_SET_DIFFICULTY if custom_set != "Standard" else DIFFICULTY.get(mode, 2)
+        records = [
+            {
+                "set": custom_set, "role": role, "mode": mode, "difficulty": difficulty,
+                "tags": ["generated"], "q": q["q"], "options": q["options"], "answer": q["answer"],
+            }
+            for q in questions
+        ]
+        yield pool, records, error
+
+
+def dedupe_records(batches, seed_texts):
+    """Drops questions that exactly or nearly repeat one already accepted (or already in the bank) for the pool."""
+    filters = {}
+    for pool, records, error in batches:
+        if pool not in filters:
+            filters[pool] = NearDuplicateFilter()
+            for text in seed_texts.get(pool, ()):
+                filters[pool].admit(text)
+        kept = [record for record in records if filters[pool].admit(record["q"])]
+        yield pool, kept, len(records) - len(kept), error
+
+
+def write_records(batches, output_path, progress, per_pool):
+    """Appends accepted records to the JSONL output, flushing after every batch so a rerun can resume."""
+    with open(output_path, "a", encoding="utf-8") as out:
+        for pool, records, duplicates, error in batches:
+            room = per_pool - progress.accepted.get(pool, 0)
+            records = records[:max(room, 0)]
+            for record in records:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+            progress.accepted[pool] = progress.accepted.get(pool, 0) + len(records)
+            progress.in_flight[pool] -= 1
+            yield pool, len(records), duplicates, error
+
+
+def existing_texts(output_path, bank, pools):
+    """Question texts per pool from the bank and a previous partial run, used to seed deduplication."""
+    texts = {pool: [] for pool in pools}
+    for pool in pools:
+        role, mode, custom_set = parse_pool(pool)
+        texts[pool].extend(q["q"] for q in bank.find(role=role, mode=mode, custom_set=custom_set))
+    if os.path.exists(output_path):
+        for record in read_jsonl(output_path):
+            pool = pool_name(record["role"], record["mode"], record["set"])
+            if pool in texts:
+                texts[pool].append(record["q"])
+    return texts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-generate AI questions for the question bank.")
+    parser.add_argument("output", help="JSONL file to append generated questions to (also the resume point)")
+    parser.add_argument("--pool", action="append", help="Pool to fill, e.g. 'Software Engineer/Technical' (default: all)")
+    parser.add_argument("--per-pool", type=int, default=100, help="Target number of new questions per pool")
+    parser.add_argument("--batch-size", type=int, default=10, help="Questions requested per LLM call")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent LLM requests")
+    parser.add_argument("--rate", type=float, default=1.0, help="Maximum LLM requests per second")
+    parser.add_argument("--ingest", action="store_true", help="Import the output into the question bank when done")
+    parser.add_argument("--source", default=os.environ.get("QUESTION_BANK_SOURCE", DEFAULT_SOURCE_PATH))
+    parser.add_argument("--bank", default=os.environ.get("QUESTION_BANK_PATH", DEFAULT_BANK_PATH))
+    args = parser.parse_args(argv)
+    if args.rate <= 0:
+        parser.error("--rate must be greater than 0")
+
+    load_dotenv()
+    # Imported after .env is loaded so provider settings apply
+    from prompts import generate_ai_interview_questions
+
+    bank = get_question_bank()
+    pools = args.pool or sorted(bank.pools())
+    progress = Progress(args.output)
+    bucket = TokenBucket(args.rate, capacity=max(1, args.workers))
+
+    def generate(role, mode, num_qs, custom_set):
+        # One attempt per job: the planner already re-requests for pools that fall short
+        return generate_ai_interview_questions(role, mode, num_qs, custom_set, max_attempts=1)
+
+    pipeline = write_records(
+        dedupe_records(
+            to_records(run_jobs(
+                plan_jobs(pools, args.per_pool, args.batch_size, progress),
+                generate, args.batch_size, args.workers, bucket,
+            )),
+            existing_texts(args.output, bank, pools),
+        ),
+        args.output, progress, args.per_pool,
+    )
+
+    started = time.perf_counter()
+    total = 0
+    for pool, written, duplicates, error in pipeline:
+        total += written
+        status = f"error: {error}" if error and not written else f"+{written} ({duplicates} duplicates)"
+        print(f"[{time.perf_counter() - started:7.1f}s] {pool}: {status}, "
+              f"{progress.accepted.get(pool, 0)}/{args.per_pool}", file=sys.stderr)
+    print(f"Generated {total} questions into {args.output}")
+    for pool in pools:
+        if progress.accepted.get(pool, 0) < args.per_pool:
+            print(f"warning: {pool} reached only {progress.accepted.get(pool, 0)}/{args.per_pool}", file=sys.stderr)
+
+    if args.ingest:
+        imported, skipped = import_questions(args.output, args.source, args.bank)
+        print(f"Imported {imported} questions ({skipped} skipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,136 @@
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+"""
+Summary charts.
+
+The default path renders static SVG from string templates that are parsed once
+and cached, so neither plotly nor any other plotting library is imported.
+`create_donut_chart` still builds the interactive plotly figure and imports
+plotly only when it is called.
+"""
+import html
+from functools import lru_cache
+from string import Template
+
+BACKGROUND = "#1e293b"
+TEXT = "#f1f5f9"
+MUTED = "#94a3b8"
+CORRECT = "#8BC34A"
+CORRECT_LIGHT = "#CDDC39"
+INCORRECT = "#ef5350"
+SKIPPED = "#37474F"
+FONT = "-apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif"
+
+DONUT_TEMPLATE = """\
+<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 200 200" width="100%" height="$height" role="img" aria-label="$label">
+<defs><linearGradient id="correct-gradient" x1="0" y1="0" x2="1" y2="1">
+<stop offset="0%" stop-color="$correct"/><stop offset="100%" stop-color="$correct_light"/></linearGradient></defs>
+<circle cx="100" cy="100" r="80" fill="none" stroke="$track" stroke-width="20"/>
+<circle cx="100" cy="100" r="80" fill="none" stroke="url(#correct-gradient)" stroke-width="20"
+ stroke-dasharray="$dash $gap" transform="rotate(-90 100 100)"/>
+<text x="100" y="112" text-anchor="middle" font-family="$font" font-size="34" fill="$text">$score/$total</text>
+</svg>"""
+
+BAR_CHART_TEMPLATE = """\
+<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 $width $height" width="100%" role="img" aria-label="$label">
+<g font-family="$font" font-size="11" fill="$muted">$axis</g>
+$bars
+</svg>"""
+
+
+@lru_cache(maxsize=None)
+def _template(source):
+    return Template(source)
+
+
+def _render(source, **values):
+    return _template(source).substitute(font=FONT, text=TEXT, muted=MUTED, **values)
+
+
+@lru_cache(maxsize=256)
+def donut_svg(score, total_questions, height=320):
+    """Overall score as an SVG donut; the static counterpart of create_donut_chart."""
+    circumference = 2 * 3.141592653589793 * 80
+    share = score / total_questions if total_questions else 0
+    dash = circumference * share
+    return _render(
+        DONUT_TEMPLATE, height=height, label=f"{score} of {total_questions} correct",
+        correct=CORRECT, correct_light=CORRECT_LIGHT, track=SKIPPED,
+        dash=f"{dash:.2f}", gap=f"{circumference - dash + 1:.2f}", score=score, total=total_questions,
+    )
+
+
+@lru_cache(maxsize=256)
+def question_breakdown_svg(outcomes, elapsed_ms=()):
+    """
+    One bar per question, coloured by outcome ("correct", "incorrect" or "skipped").
+    Bar height is the time spent on the question when `elapsed_ms` is given.
+    """
+    n = len(outcomes)
+    if n == 0:
+        return ""
+    width, height, top, bottom = 560, 220, 16, 34
+    plot_height = height - top - bottom
+    slot = (width - 40) / n
+    times = [ms for ms in elapsed_ms if ms is not None]
+    longest = max(times) if times else 0
+    colors = {"correct": CORRECT, "incorrect": INCORRECT, "skipped": SKIPPED}
+
+    bars, axis = [], []
+    for i, outcome in enumerate(outcomes):
+        ms = elapsed_ms[i] if i < len(elapsed_ms) else None
+        bar_height = plot_height * (ms / longest) if longest and ms is not None else plot_height
+        bar_height = max(bar_height, 3)
+        x = 40 + i * slot + slot * 0.15
+        y = top + plot_height - bar_height
+        title = f"Q{i + 1}: {outcome}" + (f", {ms / 1000:.1f}s" if ms is not None else "")
+        bars.append(
+            f'<rect x="{x:.1f}" y="{y:.1f}" width="{slot * 0.7:.1f}" height="{bar_height:.1f}" rx="3" '
+            f'fill="{colors.get(outcome, SKIPPED)}"><title>{html.escape(title)}</title></rect>'
+        )
+        axis.append(f'<text x="{x + slot * 0.35:.1f}" y="{height - bottom + 16}" text-anchor="middle">Q{i + 1}</text>')
+    if longest:
+        axis.append(f'<text x="34" y="{top + 4}" text-anchor="end">{longest / 1000:.0f}s</text>')
+        axis.append(f'<text x="34" y="{top + plot_height}" text-anchor="end">0s</text>')
+    return _render(
+        BAR_CHART_TEMPLATE, width=width, height=height, label="Per-question results",
+        axis="".join(axis), bars="\n".join(bars),
+    )
+
+
+@lru_cache(maxsize=256)
+def topic_breakdown_svg(topic_stats):
+    """Horizontal accuracy bars for ((topic, correct, total), ...), weakest topic first."""
+    if not topic_stats:
+        return ""
+    rows = sorted(topic_stats, key=lambda row: (row[1] / row[2], row[0]))
+    row_height, label_width, width = 28, 150, 560
+    height = row_height * len(rows) + 10
+    bar_space = width - label_width - 60
+
+    bars, axis = [], []
+    for i, (topic, correct, total) in enumerate(rows):
+        y = 5 + i * row_height
+        accuracy = correct / total
+        axis.append(f'<text x="{label_width - 8}" y="{y + 17}" text-anchor="end">{html.escape(topic)}</text>')
+        axis.append(f'<text x="{label_width + bar_space + 8}" y="{y + 17}">{correct}/{total}</text>')
+        bars.append(
+            f'<rect x="{label_width}" y="{y + 4}" width="{bar_space}" height="18" rx="3" fill="{SKIPPED}"/>'
+            f'<rect x="{label_width}" y="{y + 4}" width="{max(bar_space * accuracy, 2):.1f}" height="18" rx="3" '
+            f'fill="{CORRECT if accuracy >= 0.5 else INCORRECT}"/>'
+        )
+    return _render(
+        BAR_CHART_TEMPLATE, width=width, height=height, label="Accuracy by topic",
+        axis="".join(axis), bars="\n".join(bars),
+    )
+
 
 def create_donut_chart(score, total_questions):
     """
     Creates a donut chart visualizing the percentage of correct vs incorrect answers.
     This is the overall performance chart.
     """
+    # Imported here so the static SVG path never pays for plotly
+    import plotly.graph_objects as go
+
     correct_answers = score
     incorrect_answers = total_questions - score
 
@@ -0,0 +1,353 @@
+"""
+Batch export of stored interviews: one PDF report per interview plus a cohort
+summary (summary.csv and cohort_summary.pdf).
+
+Interviews come from the results store (utils.results_store), so a report shows
+each question's outcome and time rather than the answer text, which is not stored.
+Reports are rendered in a process pool, several interviews per task, with at most
+two tasks per worker in flight; every PDF is written out as soon as its task
+finishes. Attempt rows are read from the results store only for the sessions
+about to be rendered, a chunk of sessions at a time, so memory stays flat
+however large the cohort or the stored history is.
+
+Output is a directory or a zip archive ("-" streams the zip to stdout). A
+manifest (manifest.jsonl inside a directory, <archive>.manifest.jsonl next to
+an archive) records every finished report, so rerunning the same command
+resumes: finished reports are skipped and failed ones retried. Archives are
+closed cleanly on Ctrl-C; one left behind by a hard kill is started afresh.
+
+    python -m utils.cohort_export cohort.zip --since 2026-09-01 --mode Technical
+    python -m utils.cohort_export reports/ --user alice --user bob --workers 8
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import warnings
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+import pandas as pd
+
+SUMMARY_CSV = "summary.csv"
+SUMMARY_PDF = "cohort_summary.pdf"
+REPORTS_DIR = "reports"
+# Sessions whose attempt rows are read from the results store at a time
+SESSION_CHUNK = 500
+
+
+def report_name(user_id, session_id):
+    user = re.sub(r"[^A-Za-z0-9_.-]+", "_", user_id or "anonymous")[:64]
+    return f"{REPORTS_DIR}/{user}-{session_id}.pdf"
+
+
+def select_sessions(sessions, users=None, role=None, mode=None, since=None, until=None):
+    """Filters the results store's session frame; `since`/`until` are Unix timestamps."""
+    mask = sessions["session_id"].notna()
+    if users:
+        mask &= sessions["user_id"].isin(users)
+    if role:
+        mask &= sessions["role"] == role
+    if mode:
+        mask &= sessions["mode"] == mode
+    if since is not None:
+        mask &= sessions["finished_at"] >= since
+    if until is not None:
+        mask &= sessions["finished_at"] < until
+    cohort = sessions[mask].sort_values(["finished_at", "session_id"]).reset_index(drop=True)
+    # Percentile of each interview's composite score within the cohort
+    cohort["cohort_percentile"] = cohort["composite"].rank(pct=True, method="average") * 100
+    return cohort
+
+
+def build_jobs(cohort, read_attempts, question_texts, skip=(), chunk_size=SESSION_CHUNK):
+    """
+    Yields one render job per interview in `cohort` whose report is not in `skip`.
+    `read_attempts(session_ids)` returns the attempt rows of those sessions; it is
+    called for `chunk_size` sessions at a time as the jobs are consumed.
+    """
+    pending = cohort[~cohort["session_id"].isin(list(skip))]
+    for start in range(0, len(pending), chunk_size):
+        yield from _chunk_jobs(pending.iloc[start:start + chunk_size], read_attempts, question_texts)
+
+
+def _chunk_jobs(pending, read_attempts, question_texts):
+    rows = read_attempts(pending["session_id"].tolist()).sort_values(["session_id", "position"])
+    by_session = {session_id: group for session_id, group in rows.groupby("session_id", sort=False)}
+    for session in pending.itertuples(index=False):
+        group = by_session.get(session.session_id)
+        if group is None:
+            continue
+        questions, answers, feedback = [], [], []
+        for attempt in group.itertuples(index=False):
+            questions.append(question_texts.get(attempt.question_id, attempt.question_id))
+            ms = None if pd.isna(attempt.elapsed_ms) else int(attempt.elapsed_ms)
+            if attempt.skipped:
+                answers.append("Skipped")
+                feedback.append({"feedback": "Skipped", "score": 0})
+            else:
+                answers.append("Answered" + (f" in {ms / 1000:.1f}s" if ms is not None else ""))
+                feedback.append({
+                    "feedback": "✅ Correct" if attempt.correct else "❌ Incorrect",
+                    "score": 1 if attempt.correct else 0,
+                })
+        set_label = "" if session.custom_set == "Standard" else f" ({session.custom_set})"
+        header = [
+            f"Candidate: {session.user_id or 'anonymous'}",
+            f"Interview: {session.role} / {session.mode}{set_label}",
+            f"Finished: {datetime.fromtimestamp(session.finished_at):%Y-%m-%d %H:%M}",
+            f"Score: {session.score}/{session.total} ({session.accuracy:.0%}) in {session.time_taken:.0f}s",
+            f"Cohort percentile: {session.cohort_percentile:.0f}",
+        ]
+        yield {
+            "session_id": session.session_id,
+            "name": report_name(session.user_id, session.session_id),
+            "header": header, "questions": questions, "answers": answers, "feedback": feedback,
+        }
+
+
+def _render_batch(jobs):
+    """Runs in a worker process: returns (session_id, name, pdf bytes, error) per job."""
+    from utils.report import generate_candidate_report
+
+    results = []
+    for job in jobs:
+        try:
+            pdf = generate_candidate_report(job["header"], job["questions"], job["answers"], job["feedback"])
+            results.append((job["session_id"], job["name"], pdf, None))
+        except Exception as e:
+            results.append((job["session_id"], job["name"], None, str(e)))
+    return results
+
+
+def _batches(jobs, size):
+    batch = []
+    for job in jobs:
+        batch.append(job)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def render_reports(jobs, workers=None, batch_size=8):
+    """
+    Renders jobs across a process pool, yielding (session_id, name, pdf, error) as
+    batches finish. At most two batches per worker are queued at any time.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        batches = _batches(jobs, batch_size)
+        exhausted = False
+        try:
+            while pending or not exhausted:
+                while not exhausted and len(pending) < 2 * workers:
+                    batch = next(batches, None)
+                    if batch is None:
+                        exhausted = True
+                    else:
+                        pending.add(executor.submit(_render_batch, batch))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class DirectoryOutput:
+    def __init__(self, path):
+        self.path = path
+        self.manifest_path = os.path.join(path, "manifest.jsonl")
+        os.makedirs(os.path.join(path, REPORTS_DIR), exist_ok=True)
+
+    def write(self, name, data):
+        target = os.path.join(self.path, name)
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, target)
+
+    def close(self):
+        pass
+
+
+class ZipOutput:
+    """Appends to an existing archive when resuming; `path` "-" streams a new archive to stdout."""
+
+    def __init__(self, path, resume):
+        self.manifest_path = None if path == "-" else f"{path}.manifest.jsonl"
+        if path == "-":
+            self._zip = zipfile.ZipFile(sys.stdout.buffer, "w", zipfile.ZIP_DEFLATED)
+            return
+        if resume and os.path.exists(path):
+            try:
+                self._zip = zipfile.ZipFile(path, "a", zipfile.ZIP_DEFLATED)
+                return
+            except zipfile.BadZipFile:
+                print(f"{path} is incomplete; starting over", file=sys.stderr)
+        # Without the archive, the manifest describes reports that no longer exist
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+
+    def write(self, name, data):
+        with warnings.catch_warnings():
+            # A resumed run rewrites the summary; readers use the last entry of a name
+            warnings.filterwarnings("ignore", "Duplicate name", UserWarning)
+            self._zip.writestr(name, data)
+
+    def close(self):
+        self._zip.close()
+
+
+def read_manifest(path):
+    """Returns (session ids with a finished report, reports covered by the last summary)."""
+    finished, summarized = set(), None
+    if path is None or not os.path.exists(path):
+        return finished, summarized
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn last line from an interrupted run
+            if "summary" in entry:
+                summarized = entry["reports"]
+            elif entry.get("error") is None:
+                finished.add(entry["session_id"])
+    return finished, summarized
+
+
+def cohort_summary(cohort, question_stats):
+    """Returns (summary.csv bytes, cohort_summary.pdf bytes)."""
+    from utils.report import generate_cohort_report
+
+    columns = [
+        "user_id", "session_id", "finished_at", "role", "mode", "custom_set",
+        "score", "total", "accuracy", "time_taken", "composite", "cohort_percentile",
+    ]
+    table = cohort[columns].copy()
+    table["finished_at"] = [datetime.fromtimestamp(t).isoformat(timespec="seconds") for t in table["finished_at"]]
+    csv = table.to_csv(index=False).encode("utf-8")
+
+    ranked = cohort.sort_values("composite", ascending=False)
+    header = [
+        f"Interviews: {len(cohort)} from {cohort['user_id'].nunique()} candidates",
+        f"Accuracy: mean {cohort['accuracy'].mean():.0%}, median {cohort['accuracy'].median():.0%}",
+        f"Time per interview: median {cohort['time_taken'].median():.0f}s",
+    ]
+    hardest = question_stats[question_stats["attempts"] >= 5].assign(
+        accuracy=lambda s: s["correct"] / s["attempts"]
+    ).nsmallest(5, "accuracy")
+    if not hardest.empty:
+        header.append("Hardest questions (all interviews):")
+        header.extend(f"  {row.accuracy:.0%}  {row.question}" for row in hardest.itertuples(index=False))
+    rows = [
+        f"{rank:>4}. {row.user_id or 'anonymous':<24} {row.score}/{row.total}  {row.accuracy:>4.0%}  "
+        f"{row.time_taken:>5.0f}s  p{row.cohort_percentile:.0f}"
+        for rank, row in enumerate(ranked.itertuples(index=False), start=1)
+    ]
+    return csv, generate_cohort_report(header, rows)
+
+
+def export_cohort(store, output, cohort, workers=None, batch_size=8, resume=True, progress_every=1.0):
+    """
+    Writes a report for every interview in `cohort` (see select_sessions) plus the
+    cohort summary to `output`. Returns {"rendered", "skipped", "failed", "total"}.
+    """
+    if output != "-" and (output.endswith(os.sep) or os.path.isdir(output) or not output.endswith(".zip")):
+        writer = DirectoryOutput(output)
+    else:
+        writer = ZipOutput(output, resume)
+    finished, summarized = read_manifest(writer.manifest_path) if resume else (set(), None)
+    finished &= set(cohort["session_id"])
+    stats = {"rendered": 0, "skipped": len(finished), "failed": 0, "total": len(cohort)}
+
+    question_stats = store.question_stats_frame()
+    question_texts = dict(zip(question_stats["question_id"], question_stats["question"]))
+    jobs = build_jobs(cohort, store.read_attempts, question_texts, skip=finished)
+
+    manifest = open(writer.manifest_path, "a" if resume else "w", encoding="utf-8") if writer.manifest_path else None
+    started = last_report = time.perf_counter()
+    try:
+        for session_id, name, pdf, error in render_reports(jobs, workers, batch_size):
+            if error is None:
+                writer.write(name, pdf)
+                stats["rendered"] += 1
+            else:
+                stats["failed"] += 1
+                print(f"{session_id}: {error}", file=sys.stderr)
+            if manifest:
+                manifest.write(json.dumps({"session_id": session_id, "file": name, "error": error}) + "\n")
+                manifest.flush()
+            now = time.perf_counter()
+            if now - last_report >= progress_every:
+                last_report = now
+                _print_progress(stats, now - started)
+
+        done = stats["rendered"] + stats["skipped"]
+        if not stats["failed"] and (stats["rendered"] or summarized != done):
+            csv, pdf = cohort_summary(cohort, question_stats)
+            writer.write(SUMMARY_CSV, csv)
+            writer.write(SUMMARY_PDF, pdf)
+            if manifest:
+                manifest.write(json.dumps({"summary": SUMMARY_PDF, "reports": done}) + "\n")
+    finally:
+        writer.close()
+        if manifest:
+            manifest.close()
+    _print_progress(stats, time.perf_counter() - started)
+    return stats
+
+
+def _print_progress(stats, elapsed):
+    done = stats["rendered"] + stats["skipped"]
+    rate = stats["rendered"] / elapsed if elapsed > 0 else 0.0
+    remaining = stats["total"] - done - stats["failed"]
+    eta = f", ETA {remaining / rate:.0f}s" if rate and remaining > 0 else ""
+    print(f"[{elapsed:7.1f}s] {done}/{stats['total']} reports ({stats['rendered']} rendered, "
+          f"{stats['skipped']} already done, {stats['failed']} failed) {rate:.1f}/s{eta}", file=sys.stderr)
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value).timestamp()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export PDF reports and a summary for a cohort of interviews.")
+    parser.add_argument("output", help="Directory, .zip archive, or - to stream a zip to stdout")
+    parser.add_argument("--user", action="append", help="Candidate id to include (repeatable; default: all)")
+    parser.add_argument("--role")
+    parser.add_argument("--mode", choices=("Technical", "Behavioral"))
+    parser.add_argument("--since", type=_timestamp, help="ISO date or time, inclusive")
+    parser.add_argument("--until", type=_timestamp, help="ISO date or time, exclusive")
+    parser.add_argument("--workers", type=int, default=None, help="Renderer processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=8, help="Reports rendered per task")
+    parser.add_argument("--restart", action="store_true", help="Ignore the manifest and render everything again")
+    args = parser.parse_args(argv)
+
+    from utils.results_store import get_results_store
+
+    store = get_results_store()
+    cohort = select_sessions(store.session_frame(), args.user, args.role, args.mode, args.since, args.until)
+    if cohort.empty:
+        print("No interviews match the filters", file=sys.stderr)
+        return 1
+    try:
+        stats = export_cohort(store, args.output, cohort, args.workers, args.batch_size, resume=not args.restart)
+    except KeyboardInterrupt:
+        print("Interrupted; rerun the same command to resume", file=sys.stderr)
+        return 130
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Answer evaluation engine built on utils.fedback.
+
+Two strategies grade a whole interview in roughly the time of a single call:
+- evaluate_concurrently: one request per answer, run in parallel with bounded
+  concurrency and retry/backoff;
+- evaluate_batch: every answer graded in one structured (JSON) request, with
+  any answers the model skipped re-graded concurrently.
+
+GradingQueue grades answers one at a time as they are submitted, on a
+process-wide pool (GRADING_WORKERS threads, default 8), so an interview's
+grades are ready shortly after its last answer.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Optional
+
+from utils import metrics
+from utils.answer_cache import get_answer_cache
+from utils.fedback import complete, request_evaluation
+
+JSON_ARRAY_PATTERN = re.compile(r"\[.*\]", re.DOTALL)
+
+
+@dataclass(frozen=True)
+class Evaluation:
+    """Graded answer: feedback text and a 0-10 score. `error` is set when grading failed."""
+    feedback: str
+    score: int
+    error: Optional[str] = None
+
+
+def with_retries(fn, retries=3, base_delay=1.0, max_delay=16.0):
+    """Calls fn(), retrying failures with exponential backoff and jitter."""
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception:
+            if attempt == retries:
+                raise
+            delay = min(max_delay, base_delay * 2 ** attempt)
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+
+def _evaluate_one(question, answer, mode, retries):
+    try:
+        feedback, score = with_retries(lambda: request_evaluation(question, answer, mode), retries=retries)
+        return Evaluation(feedback, score)
+    except Exception as e:
+        return Evaluation(f"Error: {e}", 0, error=str(e))
+
+
+def evaluate_concurrently(items, mode, max_workers=4, retries=3):
+    """
+    Grades (question, answer) pairs with at most `max_workers` requests in flight.
+    Returns Evaluations in the same order as `items`.
+    """
+    items = list(items)
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items)), thread_name_prefix="evaluate") as executor:
+        futures = [executor.submit(_evaluate_one, q, a, mode, retries) for q, a in items]
+        return [future.result() for future in futures]
+
+
+def build_batch_prompt(items, mode):
+    numbered = "\n".join(
+        f"{i}. Question: {q}\n   Candidate's Answer: {a}" for i, (q, a) in enumerate(items, 1)
+    )
+    return f"""
+    You are an interviewer evaluating a candidate's answers. Mode: {mode}
+
+    {numbered}
+
+    For every answer give concise feedback (2-3 sentences) and a score out of 10.
+    Your response MUST be a valid JSON array and nothing else, with one object per answer:
+    {{"index": <answer number>, "feedback": "<text>", "score": <integer 0-10>}}
+    """
+
+
+def parse_batch_response(text, count):
+    """Returns {index: Evaluation} for every well-formed entry in a batch reply (0-based indexes)."""
+    match = JSON_ARRAY_PATTERN.search(text)
+    if not match:
+        return {}
+    try:
+        entries = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+
+    parsed = {}
+    for entry in entries if isinstance(entries, list) else []:
+        try:
+            index = int(entry["index"]) - 1
+            score = min(10, max(0, round(float(entry["score"]))))
+            feedback = str(entry["feedback"]).strip()
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= index < count:
+            parsed[index] = Evaluation(feedback, score)
+    return parsed
+
+
+def evaluate_batch(items, mode, retries=2, max_workers=4):
+    """
+    Grades all (question, answer) pairs in one structured request.
+    Entries missing from the reply (or all of them, if the request fails) are
+    graded individually with evaluate_concurrently.
+    """
+    items = list(items)
+    cache = get_answer_cache()
+    results = [None] * len(items)
+    pending = []
+    for i, (question, answer) in enumerate(items):
+        if not answer.strip():
+            results[i] = Evaluation("No answer provided.", 0)
+            continue
+        cached = cache.get(question, answer, mode)
+        if cached is not None:
+            results[i] = Evaluation(*cached)
+        else:
+            pending.append(i)
+
+    if pending:
+        batch = [items[i] for i in pending]
+        started = time.perf_counter()
+        try:
+            reply = with_retries(lambda: complete(build_batch_prompt(batch, mode), task="batch_evaluation"), retries=retries)
+            parsed = parse_batch_response(reply, len(batch))
+        except Exception as e:
+            print(f"Batch evaluation failed, grading answers individually: {e}")
+            parsed = {}
+        # Attribute the shared request's latency evenly to the answers it graded
+        latency = (time.perf_counter() - started) / len(batch)
+        for position, i in enumerate(pending):
+            result = parsed.get(position)
+            if result is not None:
+                cache.put(items[i][0], items[i][1], mode, (result.feedback, result.score), latency=latency)
+            results[i] = result
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        regraded = evaluate_concurrently([items[i] for i in missing], mode, max_workers=max_workers, retries=retries)
+        for i, result in zip(missing, regraded):
+            results[i] = result
+    return results
+
+
+_grading_pool = None
+_grading_pool_lock = threading.Lock()
+
+
+def get_grading_pool():
+    """Returns the process-wide thread pool that GradingQueues share."""
+    global _grading_pool
+    if _grading_pool is None:
+        with _grading_pool_lock:
+            if _grading_pool is None:
+                _grading_pool = ThreadPoolExecutor(
+                    max_workers=int(os.environ.get("GRADING_WORKERS", 8)), thread_name_prefix="grading"
+                )
+    return _grading_pool
+
+
+class GradingQueue:
+    """
+    Grades one interview's answers in the background as they are submitted.
+    Completed grades are picked up with drain(), so a Streamlit rerun can fold
+    them into session state without the worker threads touching it.
+    """
+
+    def __init__(self, mode, retries=2):
+        self.mode = mode
+        self.retries = retries
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, index, question, answer):
+        """Queues answer `index` for grading; resubmitting an index replaces it."""
+        submitted = time.perf_counter()
+
+        def grade():
+            result = _evaluate_one(question, answer, self.mode, self.retries)
+            metrics.observe("answer_grading_seconds", time.perf_counter() - submitted)
+            return result
+
+        future = get_grading_pool().submit(grade)
+        with self._lock:
+            self._futures[index] = future
+
+    def pending(self):
+        with self._lock:
+            return sum(not future.done() for future in self._futures.values())
+
+    def drain(self):
+        """Returns [(index, Evaluation)] for answers graded since the last call."""
+        with self._lock:
+            done = [(index, future) for index, future in self._futures.items() if future.done()]
+            for index, _ in done:
+                del self._futures[index]
+        # _evaluate_one reports failures as an Evaluation instead of raising
+        return [(index, future.result()) for index, future in done]
+
+    def wait(self, timeout=None):
+        """Blocks until every queued answer is graded or `timeout` passes; returns True if none are left."""
+        with self._lock:
+            futures = list(self._futures.values())
+        _, not_done = wait(futures, timeout=timeout)
+        return not not_done
@@ -1,39 +1,73 @@
-import openai
+import re
+import time
+from utils import metrics
+from utils.answer_cache import get_answer_cache
+from utils.llm import get_provider, get_timeout
+
+SCORE_PATTERN = re.compile(r"Score:\s*\**\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+# Markdown bold is allowed around the labels: "**Feedback:** ..." / "**Score:** 8/10"
+FEEDBACK_PATTERN = re.compile(r"Feedback:\**\s*(.*?)(?=\n\s*\**Score:|\Z)", re.IGNORECASE | re.DOTALL)
 
-def evaluate_answer(question, answer, mode):
-    """
-    Uses LLM to evaluate user answer. 
-    Returns (feedback, score).
-    """
-    if not answer.strip():
-        return "No answer provided.", 0
 
-    prompt = f"""
+def build_evaluation_prompt(question, answer, mode):
+    return f"""
     You are an interviewer evaluating an answer.
     Question: {question}
     Candidate's Answer: {answer}
     Mode: {mode}
 
     Give concise feedback (2-3 sentences) and score out of 10.
-    Format: 
+    Format:
     Feedback: <text>
     Score: <number>
     """
 
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",  # Change to "gpt-4" if available
-            messages=[{"role": "user", "content": prompt}]
-        )
-        text = response["choices"][0]["message"]["content"]
-
-        # Simple parsing (customize if needed)
-        feedback = text.split("Score:")[0].replace("Feedback:", "").strip()
-        try:
-            score = int(text.split("Score:")[-1].strip())
-        except:
-            score = 5
-        return feedback, score
 
+def parse_evaluation(text):
+    """
+    Parses a "Feedback: ... Score: N" reply into (feedback, score).
+    Scores are clamped to 0-10; a missing score falls back to 5.
+    """
+    score_match = SCORE_PATTERN.search(text)
+    score = min(10, max(0, round(float(score_match.group(1))))) if score_match else 5
+
+    feedback_match = FEEDBACK_PATTERN.search(text)
+    if feedback_match:
+        feedback = feedback_match.group(1).strip()
+    else:
+        feedback = SCORE_PATTERN.split(text)[0].strip()
+    return feedback, score
+
+
+def complete(prompt, task="evaluation"):
+    """Sends a single-turn prompt to the evaluation provider and returns the reply text. Raises on API errors."""
+    with metrics.timer("llm_request_seconds", purpose=task):
+        return get_provider("evaluation").generate(prompt, timeout=get_timeout(), task=task)
+
+
+def request_evaluation(question, answer, mode):
+    """Like evaluate_answer, but lets API errors propagate so callers can retry."""
+    if not answer.strip():
+        return "No answer provided.", 0
+
+    # Near-identical answers to the same question are graded once
+    cache = get_answer_cache()
+    cached = cache.get(question, answer, mode)
+    if cached is not None:
+        return cached
+
+    started = time.perf_counter()
+    result = parse_evaluation(complete(build_evaluation_prompt(question, answer, mode)))
+    cache.put(question, answer, mode, result, latency=time.perf_counter() - started)
+    return result
+
+
+def evaluate_answer(question, answer, mode):
+    """
+    Uses LLM to evaluate user answer.
+    Returns (feedback, score).
+    """
+    try:
+        return request_evaluation(question, answer, mode)
     except Exception as e:
         return f"Error: {str(e)}", 0
@@ -0,0 +1,254 @@
+"""
+Compact per-session interview state.
+
+A session used to keep its own copies of every question dict (text plus four
+option strings) and parallel lists of answer and feedback display strings.
+InterviewRecord instead holds small integer handles into a process-wide
+QuestionRegistry, where each distinct bank question is stored once no matter
+how many sessions serve it, plus one packed array per outcome field. Answer and
+feedback strings are rendered from the question when they are displayed.
+
+The registry only holds bank questions, a bounded set. AI-generated questions
+are kept in the record that served them, so they are freed with the session.
+Free-text answers and their grades are the only other per-session strings kept.
+"""
+import sys
+import threading
+from array import array
+
+from utils.question_bank import question_id
+
+# Choice codes for answers that are not an option index
+SKIPPED = -1
+NOT_ANSWERED = -2
+FREE_TEXT = -3
+# Stored in place of an unknown elapsed time
+NO_TIME = -1
+# Set on handles that index the record's own (AI-generated) questions rather than the registry
+LOCAL_HANDLE = 1 << 31
+
+CORRECT_FEEDBACK = "✅ Correct"
+SKIPPED_FEEDBACK = "Skipped"
+GRADING_FEEDBACK = "⏳ Grading..."
+# Free-text answers scoring at least this (out of 10) count as correct
+PASS_SCORE = 7
+
+
+class QuestionRegistry:
+    """
+    Interns bank question dicts and hands out integer handles. Entries are never
+    evicted, so only questions from the bank (which has a fixed size) belong here.
+    A question is keyed by its id together with its text, options and answer, so an
+    edited question never picks up an older version's options. Registered dicts are
+    shared and must not be mutated.
+    """
+
+    def __init__(self):
+        self._questions = []
+        self._handles = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._questions)
+
+    def intern(self, question):
+        """Returns the handle for `question`, registering it on first sight."""
+        key = _content_key(question)
+        handle = self._handles.get(key)
+        if handle is not None:
+            return handle
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is None:
+                handle = len(self._questions)
+                self._questions.append(_compact(question))
+                self._handles[key] = handle
+        return handle
+
+    def get(self, handle):
+        return self._questions[handle]
+
+
+def _content_key(question):
+    return question_id(question), question["q"], tuple(question.get("options", ())), question.get("answer", "")
+
+
+def _compact(question, intern=True):
+    # Interned strings are shared with any other copy of the same text
+    compact = dict(question)
+    store = sys.intern if intern else str
+    compact["q"] = store(question["q"])
+    compact["options"] = tuple(store(option) for option in question.get("options", ()))
+    compact["answer"] = store(question.get("answer", ""))
+    return compact
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_question_registry():
+    """Returns the process-wide question registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = QuestionRegistry()
+    return _registry
+
+
+def choice_index(question, answer):
+    """Maps an answer string (an option, "Skipped" or "Not Answered") to its choice code."""
+    if answer == "Skipped":
+        return SKIPPED
+    try:
+        return list(question.get("options", ())).index(answer)
+    except ValueError:
+        return NOT_ANSWERED
+
+
+class InterviewRecord:
+    """
+    The questions served in one interview and the outcome of each answered one.
+    Answers are stored as option indexes (or SKIPPED / NOT_ANSWERED), correctness
+    as bytes and elapsed times as milliseconds (NO_TIME when unknown). Free-text
+    answers (FREE_TEXT) keep their text and, once graded, (feedback, score) in
+    dicts keyed by answer index, which stay None for multiple-choice interviews.
+    Bank questions are registry handles; AI-generated ones live in `local` and
+    their handles carry LOCAL_HANDLE.
+    """
+
+    __slots__ = ("handles", "local", "choices", "correct", "elapsed", "texts", "grades")
+
+    def __init__(self, questions=()):
+        self.handles = array("I")
+        self.local = None
+        self.choices = array("b")
+        self.correct = bytearray()
+        self.elapsed = array("i")
+        self.texts = None
+        self.grades = None
+        self.add_questions(questions)
+
+    @property
+    def question_count(self):
+        return len(self.handles)
+
+    @property
+    def answered(self):
+        """Number of answered questions, which is also the index of the current one."""
+        return len(self.choices)
+
+    @property
+    def score(self):
+        return sum(self.correct)
+
+    def add_questions(self, questions):
+        registry = get_question_registry()
+        for q in questions:
+            if q.get("id"):
+                self.handles.append(registry.intern(q))
+            else:
+                if self.local is None:
+                    self.local = []
+                # Not interned: runtime-interned strings can outlive the session
+                self.local.append(_compact(q, intern=False))
+                self.handles.append(LOCAL_HANDLE | (len(self.local) - 1))
+
+    def sync(self, questions):
+        """Adds questions that were appended to `questions` (e.g. a QuestionStream's list) since the last call."""
+        if len(questions) > len(self.handles):
+            self.add_questions(questions[len(self.handles):])
+
+    def _get(self, handle, registry):
+        if handle & LOCAL_HANDLE:
+            return self.local[handle & ~LOCAL_HANDLE]
+        return registry.get(handle)
+
+    def question(self, index):
+        return self._get(self.handles[index], get_question_registry())
+
+    def questions(self):
+        registry = get_question_registry()
+        return [self._get(handle, registry) for handle in self.handles]
+
+    def record(self, choice, correct, elapsed_ms=None):
+        """Stores the outcome of the current question."""
+        self.choices.append(choice)
+        self.correct.append(1 if correct else 0)
+        self.elapsed.append(NO_TIME if elapsed_ms is None else min(int(elapsed_ms), 2 ** 31 - 1))
+
+    def record_text(self, answer, elapsed_ms=None):
+        """Stores a free-text answer for the current question; it counts as incorrect until graded."""
+        if self.texts is None:
+            self.texts = {}
+        self.texts[self.answered] = answer
+        self.record(FREE_TEXT, False, elapsed_ms)
+
+    def set_grade(self, index, feedback, score):
+        if self.grades is None:
+            self.grades = {}
+        self.grades[index] = (feedback, score)
+        self.correct[index] = 1 if score >= PASS_SCORE else 0
+
+    def ungraded(self):
+        """Indexes of free-text answers still waiting for a grade."""
+        return [i for i in (self.texts or ()) if i not in (self.grades or ())]
+
+    def answer_text(self, index):
+        choice = self.choices[index]
+        if choice == SKIPPED:
+            return "Skipped"
+        if choice == NOT_ANSWERED:
+            return "Not Answered"
+        if choice == FREE_TEXT:
+            return self.texts[index]
+        return self.question(index)["options"][choice]
+
+    def feedback_text(self, index):
+        if self.choices[index] == FREE_TEXT:
+            grade = (self.grades or {}).get(index)
+            if grade is None:
+                return GRADING_FEEDBACK
+            return f"{'✅' if self.correct[index] else '❌'} {grade[1]}/10: {grade[0]}"
+        if self.choices[index] < 0:
+            return SKIPPED_FEEDBACK
+        if self.correct[index]:
+            return CORRECT_FEEDBACK
+        return f"❌ Incorrect (Correct Answer: {self.question(index)['answer']})"
+
+    def scores(self):
+        """Score out of 10 per answer: the grade for free text, 10 or 0 for multiple choice."""
+        return [
+            (self.grades or {}).get(i, (None, 0))[1] if choice == FREE_TEXT else 10 * correct
+            for i, (choice, correct) in enumerate(zip(self.choices, self.correct))
+        ]
+
+    def answers(self):
+        return [self.answer_text(i) for i in range(self.answered)]
+
+    def feedback(self):
+        return [self.feedback_text(i) for i in range(self.answered)]
+
+    def elapsed_ms(self):
+        return [None if ms == NO_TIME else ms for ms in self.elapsed]
+
+    def outcomes(self):
+        """Per-answer dicts in the shape utils.results_store expects."""
+        return [
+            {
+                "correct": bool(correct), "skipped": choice in (SKIPPED, NOT_ANSWERED),
+                "elapsed_ms": None if ms == NO_TIME else ms,
+            }
+            for choice, correct, ms in zip(self.choices, self.correct, self.elapsed)
+        ]
+
+    def nbytes(self):
+        """Memory held by this record, including its AI questions (the registry is shared and not included)."""
+        return sys.getsizeof(self) + sum(
+            sys.getsizeof(field) for field in (self.handles, self.choices, self.correct, self.elapsed)
+        ) + sum(sys.getsizeof(field) for field in (self.local, self.texts, self.grades) if field is not None) + sum(
+            sys.getsizeof(q) + sys.getsizeof(q["q"]) + sys.getsizeof(q["options"]) + sys.getsizeof(q["answer"])
+            + sum(sys.getsizeof(option) for option in q["options"])
+            for q in self.local or ()
+        )
@@ -0,0 +1,344 @@
+"""
+Pluggable LLM provider layer shared by question generation and answer evaluation.
+
+Each provider owns one long-lived client that is created on first use. The
+OpenAI-compatible providers (OpenAI, Groq) all send their requests through one
+shared, bounded httpx connection pool. Every call takes a timeout. Several
+providers can be chained with FailoverProvider, which either fails over
+sequentially or hedges slow requests to the next provider.
+
+Providers are picked per purpose from environment variables:
+    QUESTION_LLM_PROVIDERS    default "gemini"   (e.g. "gemini,groq")
+    EVALUATION_LLM_PROVIDERS  default "openai"
+    LLM_PROVIDERS             overrides both (e.g. "stub" for offline load tests)
+    LLM_TIMEOUT               per-call timeout in seconds (default 30)
+    LLM_HEDGE_AFTER           seconds before a hedged request is sent (default: no hedging)
+    LLM_STUB_LATENCY          simulated latency of the stub provider in seconds
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_PROVIDERS = {"questions": "gemini", "evaluation": "openai"}
+# Total connections in the shared pool, across every OpenAI-compatible provider
+HTTP_MAX_CONNECTIONS = 40
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Returns the process-wide httpx client that the OpenAI-compatible providers share."""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                import httpx
+                _http_client = httpx.Client(limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                ))
+    return _http_client
+
+
+class LLMError(Exception):
+    """Raised when no provider could produce a response."""
+
+
+class Provider:
+    """Base class. Subclasses implement generate() and optionally stream()."""
+
+    name = "base"
+
+    def is_configured(self):
+        return True
+
+    def generate(self, prompt, timeout=DEFAULT_TIMEOUT, task=None):
+        """Returns the full response text. `task` is a hint used only by the stub provider."""
+        raise NotImplementedError
+
+    def stream(self, prompt, timeout=DEFAULT_TIMEOUT, task=None):
+        """Yields the response text in chunks. Defaults to a single chunk."""
+        yield self.generate(prompt, timeout=timeout, task=task)
+
+
+class GeminiProvider(Provider):
+    name = "gemini"
+
+    def __init__(self, model_name="gemini-1.5-flash-latest", api_key_env="GOOGLE_API_KEY"):
+        self.model_name = model_name
+        self.api_key_env = api_key_env
+        self._model = None
+        self._lock = threading.Lock()
+
+    def is_configured(self):
+        return bool(os.environ.get(self.api_key_env))
+
+    def _get_model(self):
+        # The SDK keeps its transport on the model object, so one model is reused for every call
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    if not self.is_configured():
+                        raise LLMError(f"{self.api_key_env} is not set")
+                    import google.generativeai as genai
+                    genai.configure(api_key=os.environ[self.api_key_env])
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate(self, prompt, timeout=DEFAULT_TIMEOUT, task=None):
+        response = self._get_model().generate_content(prompt, request_options={"timeout": timeout})
+        return response.text
+
+    def stream(self, prompt, timeout=DEFAULT_TIMEOUT, task=None):
+        response = self._get_model().generate_content(prompt, stream=True, request_options={"timeout": timeout})
+        for chunk in response:
+            yield chunk.text
+
+
+class ChatCompletionsProvider(Provider):
+    """Shared implementation for OpenAI-compatible chat completion SDKs."""
+
+    api_key_env = None
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self._client = None
+        self._lock = threading.Lock()
+
+    def is_configured(self):
+        return bool(os.environ.get(self.api_key_env))
+
+    def _make_client(self, http_client):
+        raise NotImplementedError
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    if not self.is_configured():
+                        raise LLMError(f"{self.api_key_env} is not set")
+                    self._client = self._make_client(get_http_client())
+        return self._client
+
+    def generate(self, prompt, timeout=DEFAULT_TIMEOUT, task=None):
+        response = self._get_client().chat.completions.create(
+            model=self.model_name,
+            messages=[{"role": "user", "content": prompt}],
+            timeout=timeout,
+        )
+        return response.choices[0].message.content
+
+    def stream(self, prompt, timeout=DEFAULT_TIMEOUT, task=None):
+        response = self._get_client().chat.completions.create(
+            model=self.model_name,
+            messages=[{"role": "user", "content": prompt}],
+            timeout=timeout,
+            stream=True,
+        )
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class OpenAIProvider(ChatCompletionsProvider):
+    name = "openai"
+    api_key_env = "OPENAI_API_KEY"
+
+    def __init__(self, model_name="gpt-3.5-turbo"):  # Change to "gpt-4" if available
+        super().__init__(model_name)
+
+    def _make_client(self, http_client):
+        import openai
+        # Retries are handled by the callers and by failover, not inside the SDK
+        return openai.OpenAI(api_key=os.environ[self.api_key_env], http_client=http_client, max_retries=0)
+
+
+class GroqProvider(ChatCompletionsProvider):
+    name = "groq"
+    api_key_env = "GROQ_API_KEY"
+
+    def __init__(self, model_name="llama-3.1-8b-instant"):
+        super().__init__(model_name)
+
+    def _make_client(self, http_client):
+        import groq
+        return groq.Groq(api_key=os.environ[self.api_key_env], http_client=http_client, max_retries=0)
+
+
+class StubProvider(Provider):
+    """
+    Deterministic offline provider for load tests and local development.
+    Responses depend only on the prompt and how many times it has been sent,
+    and every call sleeps for `latency` seconds.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency=None):
+        self.latency = float(os.environ.get("LLM_STUB_LATENCY", 0.0)) if latency is None else latency
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _rng(self, prompt):
+        with self._lock:
+            count = self._calls.get(prompt, 0)
+            self._calls[prompt] = count + 1
+        digest = hashlib.sha256(f"{count}:{prompt}".encode()).hexdigest()
+        return random.Random(digest), digest[:8]
+
+    def _sleep(self, seconds, timeout):
+        if seconds > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"stub provider exceeded the {timeout}s timeout")
+        time.sleep(seconds)
+
+    def generate(self, prompt, timeout=DEFAULT_TIMEOUT, task=None):
+        self._sleep(self.latency, timeout)
+        return self._respond(prompt, task)
+
+    def stream(self, prompt, timeout=DEFAULT_TIMEOUT, task=None):
+        text = self._respond(prompt, task)
+        chunks = [text[i:i + 64] for i in range(0, len(text), 64)] or [""]
+        per_chunk = self.latency / len(chunks)
+        for chunk in chunks:
+            self._sleep(per_chunk, timeout)
+            yield chunk
+
+    def _respond(self, prompt, task):
+        rng, tag = self._rng(prompt)
+        if task == "questions":
+            match = re.search(r"Generate (\d+)", prompt)
+            count = int(match.group(1)) if match else 5
+            questions = []
+            for i in range(count):
+                options = [f"Option {letter} ({tag}-{i})" for letter in "ABCD"]
+                questions.append({
+                    "q": f"Stub question {i + 1} ({tag}-{i})?",
+                    "options": options,
+                    "answer": rng.choice(options),
+                })
+            return json.dumps(questions)
+        if task == "batch_evaluation":
+            count = len(re.findall(r"^\s*\d+\. Question:", prompt, re.MULTILINE))
+            return json.dumps([
+                {"index": i + 1, "feedback": f"Stub feedback ({tag}-{i}).", "score": rng.randint(0, 10)}
+                for i in range(count)
+            ])
+        return f"Feedback: Stub feedback ({tag}).\nScore: {rng.randint(0, 10)}"
+
+
+class FailoverProvider(Provider):
+    """
+    Tries providers in order. With `hedge_after` set, the next provider is also
+    started if the current one has not answered within that many seconds, and
+    the first successful response wins.
+    """
+
+    name = "failover"
+
+    def __init__(self, providers, hedge_after=None):
+        self.providers = providers
+        self.hedge_after = hedge_after
+        self._executor = ThreadPoolExecutor(max_workers=8 * len(providers), thread_name_prefix="llm-failover")
+
+    def is_configured(self):
+        return any(p.is_configured() for p in self.providers)
+
+    def generate(self, prompt, timeout=DEFAULT_TIMEOUT, task=None):
+        deadline = time.monotonic() + timeout
+        candidates = [p for p in self.providers if p.is_configured()]
+        running = {}
+        errors = []
+
+        while candidates or running:
+            if candidates and (not running or self.hedge_after is not None):
+                provider = candidates.pop(0)
+                # Leave part of the budget for the providers still to be tried
+                remaining = max(0.0, deadline - time.monotonic()) / (len(candidates) + 1)
+                running[self._executor.submit(provider.generate, prompt, remaining, task)] = provider
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = remaining
+            if candidates and self.hedge_after is not None:
+                wait_for = min(wait_for, self.hedge_after)
+            done, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                provider = running.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    errors.append(f"{provider.name}: {e}")
+
+        errors.extend(f"{p.name}: timed out" for p in running.values())
+        raise LLMError("All providers failed: " + "; ".join(errors) if errors else "No provider is configured")
+
+    def stream(self, prompt, timeout=DEFAULT_TIMEOUT, task=None):
+        # Streams can only fail over before the first chunk has been yielded
+        errors = []
+        for provider in self.providers:
+            if not provider.is_configured():
+                continue
+            started = False
+            try:
+                for chunk in provider.stream(prompt, timeout=timeout, task=task):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started:
+                    raise
+                errors.append(f"{provider.name}: {e}")
+        raise LLMError("All providers failed: " + "; ".join(errors) if errors else "No provider is configured")
+
+
+PROVIDER_CLASSES = {
+    "gemini": GeminiProvider,
+    "openai": OpenAIProvider,
+    "groq": GroqProvider,
+    "stub": StubProvider,
+}
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def _single_provider(name):
+    # One instance (and so one connection pool) per provider per process
+    with _providers_lock:
+        if name not in _providers:
+            if name not in PROVIDER_CLASSES:
+                raise ValueError(f"Unknown LLM provider {name!r}; expected one of {sorted(PROVIDER_CLASSES)}")
+            _providers[name] = PROVIDER_CLASSES[name]()
+        return _providers[name]
+
+
+def get_provider(purpose):
+    """Returns the configured provider (or failover chain) for 'questions' or 'evaluation'."""
+    names = os.environ.get("LLM_PROVIDERS") or os.environ.get(
+        f"{purpose.upper()}_LLM_PROVIDERS", DEFAULT_PROVIDERS[purpose]
+    )
+    names = [name.strip() for name in names.split(",") if name.strip()]
+    if len(names) == 1:
+        return _single_provider(names[0])
+
+    key = ",".join(names)
+    providers = [_single_provider(name) for name in names]
+    with _providers_lock:
+        if key not in _providers:
+            hedge_after = os.environ.get("LLM_HEDGE_AFTER")
+            _providers[key] = FailoverProvider(providers, hedge_after=float(hedge_after) if hedge_after else None)
+        return _providers[key]
+
+
+def get_timeout():
+    return float(os.environ.get("LLM_TIMEOUT", DEFAULT_TIMEOUT))
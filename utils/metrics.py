@@ -0,0 +1,272 @@
+"""
+Lightweight in-process instrumentation: counters, histograms and timers,
+rendered in the Prometheus text format.
+
+Everything is a no-op unless METRICS_ENABLED is set, so instrumented hot paths
+only pay for one flag check. When enabled, metrics can be exported through:
+    METRICS_PORT           serve /metrics over HTTP on this port
+    METRICS_DUMP_PATH      periodically write the metrics text to this file
+    METRICS_DUMP_INTERVAL  seconds between dumps (default 15)
+
+SamplingProfiler is an optional, per-session stack sampler for a single thread.
+"""
+import bisect
+import collections
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENABLED = os.environ.get("METRICS_ENABLED", "").lower() in ("1", "true", "yes")
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_metrics = {}
+_registry_lock = threading.Lock()
+_exporters_started = False
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = collections.defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] += amount
+
+    def render(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {value:g}" for key, value in values]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = []
+        with self._lock:
+            series_items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items()]
+        for key, (counts, total, count) in series_items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', f'{bound:g}')])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total:g}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+def _get_or_create(cls, name, help_text, **kwargs):
+    metric = _metrics.get(name)
+    if metric is None:
+        with _registry_lock:
+            metric = _metrics.get(name)
+            if metric is None:
+                metric = _metrics[name] = cls(name, help_text, **kwargs)
+    return metric
+
+
+def inc(name, amount=1, help_text="", **labels):
+    """Increments a counter. No-op when metrics are disabled."""
+    if ENABLED:
+        _get_or_create(Counter, name, help_text).inc(amount, **labels)
+
+
+def observe(name, value, help_text="", **labels):
+    """Records a histogram observation (seconds by default). No-op when metrics are disabled."""
+    if ENABLED:
+        _get_or_create(Histogram, name, help_text).observe(value, **labels)
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.started, **self.labels)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name, **labels):
+    """Context manager that records its duration in the `name` histogram."""
+    return _Timer(name, labels) if ENABLED else _NULL_TIMER
+
+
+def render_prometheus():
+    """Returns every registered metric in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = sorted(_metrics.values(), key=lambda m: m.name)
+    lines = []
+    for metric in metrics:
+        if metric.help_text:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def dump(path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_exporters():
+    """Starts the HTTP endpoint and/or dump thread configured in the environment. Safe to call on every rerun."""
+    global _exporters_started
+    if not ENABLED or _exporters_started:
+        return
+    with _registry_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+
+    port = os.environ.get("METRICS_PORT")
+    if port:
+        try:
+            server = ThreadingHTTPServer(("0.0.0.0", int(port)), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        except OSError as e:
+            print(f"Could not start metrics endpoint on port {port}: {e}")
+
+    dump_path = os.environ.get("METRICS_DUMP_PATH")
+    if dump_path:
+        interval = float(os.environ.get("METRICS_DUMP_INTERVAL", 15))
+
+        def dump_loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    dump(dump_path)
+                except OSError as e:
+                    print(f"Could not write metrics to {dump_path}: {e}")
+
+        threading.Thread(target=dump_loop, name="metrics-dump", daemon=True).start()
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread every `interval` seconds from a background
+    thread and aggregates the samples as collapsed stacks (flame graph format).
+    """
+
+    def __init__(self, thread_id=None, interval=0.005, max_depth=64):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Samples in collapsed-stack format, one `stack count` per line."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, n=15):
+        """Leaf frames ranked by the share of samples they appear in."""
+        leaves = collections.Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = self.samples or 1
+        return [(frame, count / total) for frame, count in leaves.most_common(n)]
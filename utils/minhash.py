@@ -0,0 +1,86 @@
+"""
+MinHash signatures and an LSH index for near-duplicate text detection.
+Pure Python, so no embedding model or extra dependency is needed.
+"""
+import hashlib
+import random
+import re
+import string
+
+MERSENNE_PRIME = (1 << 61) - 1
+_PUNCTUATION = str.maketrans("", "", string.punctuation)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Lowercases, strips punctuation and collapses whitespace."""
+    return _WHITESPACE.sub(" ", text.lower().translate(_PUNCTUATION)).strip()
+
+
+def shingles(text, k=3):
+    """Word k-grams of the normalized text (the whole text if it is shorter than k words)."""
+    words = normalize_text(text).split()
+    if len(words) <= k:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class MinHasher:
+    """Computes fixed-length MinHash signatures; equal slots estimate Jaccard similarity."""
+
+    def __init__(self, num_perm=64, shingle_size=3, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+
+    def signature(self, text):
+        hashes = [_hash64(s) for s in shingles(text, self.shingle_size)]
+        return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in self._perms)
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class LSHIndex:
+    """
+    Locality-sensitive hashing over MinHash signatures. Signatures are split into
+    `bands`; any shared band makes two keys candidates, so lookups touch only
+    likely matches instead of every stored signature.
+    """
+
+    def __init__(self, num_perm=64, bands=16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets = {}
+
+    def _band_keys(self, signature, namespace):
+        for band in range(self.bands):
+            yield (namespace, band, signature[band * self.rows:(band + 1) * self.rows])
+
+    def add(self, key, signature, namespace=None):
+        for band_key in self._band_keys(signature, namespace):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key, signature, namespace=None):
+        for band_key in self._band_keys(signature, namespace):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def candidates(self, signature, namespace=None):
+        found = set()
+        for band_key in self._band_keys(signature, namespace):
+            found |= self._buckets.get(band_key, set())
+        return found
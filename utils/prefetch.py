@@ -0,0 +1,87 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.question_bank import question_id
+
+
+class QuestionPrefetcher:
+    """
+    Keeps a per-(role, mode, custom_set) buffer of validated AI questions filled
+    by a small background thread pool, so interviews can start without waiting
+    on the model.
+
+    `generate(role, mode, num_qs, custom_set)` must return (questions, error),
+    like prompts.generate_ai_interview_questions. `validate(question)` filters
+    out malformed items before they reach the buffer.
+    """
+
+    def __init__(self, generate, validate, batch_size=10, low_watermark=10, capacity=30, max_workers=2):
+        self.generate = generate
+        self.validate = validate
+        self.batch_size = batch_size
+        self.low_watermark = low_watermark
+        self.capacity = capacity
+        self._buffers = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="question-prefetch")
+
+    def size(self, key):
+        with self._lock:
+            return len(self._buffers.get(key, ()))
+
+    def warm(self, key):
+        """Schedules a refill for `key` if its buffer is below the low watermark."""
+        with self._lock:
+            buffered = len(self._buffers.get(key, ()))
+            if buffered >= self.low_watermark or key in self._in_flight:
+                return
+            self._in_flight.add(key)
+        self._executor.submit(self._refill, key)
+
+    def take(self, key, n, exclude=None):
+        """
+        Pops `n` buffered questions for `key` whose ids are not in `exclude`, or returns
+        None if fewer are ready; questions skipped stay buffered for other candidates.
+        Either way a refill is scheduled when the buffer runs low.
+        """
+        taken = None
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is not None and len(buffer) >= n:
+                if exclude is None:
+                    taken = [buffer.popleft() for _ in range(n)]
+                else:
+                    fresh = [q for q in buffer if question_id(q) not in exclude][:n]
+                    if len(fresh) == n:
+                        taken = fresh
+                        picked = {id(q) for q in fresh}
+                        self._buffers[key] = deque(q for q in buffer if id(q) not in picked)
+        self.warm(key)
+        return taken
+
+    def _refill(self, key):
+        role, mode, custom_set = key
+        try:
+            while self.size(key) < self.low_watermark:
+                questions, error = self.generate(role, mode, self.batch_size, custom_set)
+                if not questions:
+                    print(f"Question prefetch for {key} failed: {error}")
+                    return
+                valid = [q for q in questions if self.validate(q)]
+                added = 0
+                with self._lock:
+                    buffer = self._buffers.setdefault(key, deque())
+                    seen = {q["q"] for q in buffer}
+                    for q in valid:
+                        if q["q"] not in seen and len(buffer) < self.capacity:
+                            buffer.append(q)
+                            seen.add(q["q"])
+                            added += 1
+                # Stop if the model only produced invalid or duplicate questions
+                if not added:
+                    return
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
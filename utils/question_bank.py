@@ -0,0 +1,457 @@
+"""
+Indexed question bank backed by SQLite.
+
+The versioned source of truth is `data/questions.jsonl` (one question per line).
+It is compiled on first use into a SQLite file that is opened read-only and
+memory-mapped, with indexes by pool, set, role, mode, tag and difficulty.
+The bank is rebuilt automatically whenever the source file changes.
+
+Command line:
+    python -m utils.question_bank build
+    python -m utils.question_bank stats
+    python -m utils.question_bank import new_questions.jsonl
+    python -m utils.question_bank export out.jsonl [--role R] [--mode M] [--set S] [--tag T]
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+
+SCHEMA_VERSION = 1
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SOURCE_PATH = os.path.join(ROOT_DIR, "data", "questions.jsonl")
+DEFAULT_BANK_PATH = os.path.join(ROOT_DIR, ".cache", "question_bank.sqlite3")
+MMAP_SIZE = 256 * 1024 * 1024
+
+REQUIRED_FIELDS = ("set", "role", "mode", "q", "options", "answer")
+
+
+def pool_name(role, mode, custom_set="Standard"):
+    """Custom sets form a single pool; standard questions are pooled by role and mode."""
+    if custom_set != "Standard":
+        return custom_set
+    return f"{role}/{mode}"
+
+
+def question_id(question):
+    """Stable identity of a served question: bank questions keep their id, generated ones hash their text."""
+    if question.get("id"):
+        return str(question["id"])
+    return "ai-" + hashlib.sha1(question["q"].strip().lower().encode("utf-8")).hexdigest()[:16]
+
+
+def source_fingerprint(source_path):
+    stat = os.stat(source_path)
+    return f"{SCHEMA_VERSION}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def read_jsonl(path):
+    """Yields the records of a JSONL file, skipping blank lines."""
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({e})") from e
+
+
+def validate_record(record):
+    """Returns an error message for a malformed bank record, or None."""
+    missing = [field for field in REQUIRED_FIELDS if field not in record]
+    if missing:
+        return f"missing fields {missing}"
+    if not isinstance(record["options"], list) or len(record["options"]) != 4:
+        return "options must be a list of exactly 4 strings"
+    if record["answer"] not in record["options"]:
+        return "answer must match one of the options"
+    return None
+
+
+def build_bank(source_path=DEFAULT_SOURCE_PATH, bank_path=DEFAULT_BANK_PATH):
+    """Compiles the JSONL source into a fresh SQLite bank, replacing any old one atomically."""
+    os.makedirs(os.path.dirname(os.path.abspath(bank_path)), exist_ok=True)
+    tmp_path = f"{bank_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    fingerprint = source_fingerprint(source_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript("""
+            PRAGMA journal_mode=OFF;
+            PRAGMA synchronous=OFF;
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE pools (pool TEXT PRIMARY KEY, size INTEGER NOT NULL);
+            CREATE TABLE questions (
+                id INTEGER PRIMARY KEY,
+                pool TEXT NOT NULL,
+                pos INTEGER NOT NULL,
+                set_name TEXT NOT NULL,
+                role TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                difficulty INTEGER NOT NULL,
+                q TEXT NOT NULL,
+                options TEXT NOT NULL,
+                answer TEXT NOT NULL
+            );
+            CREATE TABLE question_tags (tag TEXT NOT NULL, question_id INTEGER NOT NULL);
+        """)
+
+        pool_sizes = {}
+        rows = []
+        tags = []
+        for record in read_jsonl(source_path):
+            error = validate_record(record) or (None if "id" in record else "missing id")
+            if error:
+                print(f"Skipping question {record.get('id')}: {error}")
+                continue
+            pool = pool_name(record["role"], record["mode"], record["set"])
+            pos = pool_sizes.get(pool, 0)
+            pool_sizes[pool] = pos + 1
+            rows.append((
+                record["id"], pool, pos, record["set"], record["role"], record["mode"],
+                int(record.get("difficulty", 2)), record["q"],
+                json.dumps(record["options"], ensure_ascii=False), record["answer"],
+            ))
+            tags.extend((tag, record["id"]) for tag in record.get("tags", []))
+            if len(rows) >= 10000:
+                _insert_rows(conn, rows, tags)
+        _insert_rows(conn, rows, tags)
+
+        conn.executemany("INSERT INTO pools (pool, size) VALUES (?, ?)", pool_sizes.items())
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+            ("schema_version", str(SCHEMA_VERSION)),
+            ("source_fingerprint", fingerprint),
+        ])
+        # Indexes are created after the bulk load, which is much faster for large banks
+        conn.executescript("""
+            CREATE UNIQUE INDEX idx_questions_pool_pos ON questions(pool, pos);
+            CREATE INDEX idx_questions_pool_difficulty ON questions(pool, difficulty);
+            CREATE INDEX idx_questions_role_mode ON questions(role, mode);
+            CREATE INDEX idx_questions_set ON questions(set_name);
+            CREATE INDEX idx_questions_difficulty ON questions(difficulty);
+            CREATE INDEX idx_question_tags_tag ON question_tags(tag, question_id);
+        """)
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, bank_path)
+    return bank_path
+
+
+def _insert_rows(conn, rows, tags):
+    conn.executemany(
+        "INSERT INTO questions (id, pool, pos, set_name, role, mode, difficulty, q, options, answer) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.executemany("INSERT INTO question_tags (tag, question_id) VALUES (?, ?)", tags)
+    rows.clear()
+    tags.clear()
+
+
+class QuestionBank:
+    """Read-only access to a compiled bank. Safe to share between threads."""
+
+    COLUMNS = "id, pool, set_name, role, mode, difficulty, q, options, answer"
+
+    def __init__(self, bank_path=DEFAULT_BANK_PATH):
+        self.bank_path = bank_path
+        self._local = threading.local()
+        self._pool_sizes = dict(self._conn().execute("SELECT pool, size FROM pools"))
+        self._difficulty_indexes = {}
+        self._index_lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.bank_path}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            conn.execute("PRAGMA query_only=ON")
+            self._local.conn = conn
+        return conn
+
+    def meta(self, key):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def pools(self):
+        return dict(self._pool_sizes)
+
+    def pool_size(self, pool):
+        return self._pool_sizes.get(pool, 0)
+
+    def sample(self, pool, k, rng=random, exclude=None, max_rounds=4):
+        """
+        Returns `k` distinct random questions from `pool` (fewer if the pool is smaller).
+        Positions are sampled directly and fetched through the (pool, pos) index,
+        so the cost is O(k) regardless of pool size.
+
+        `exclude` is an optional container of question ids (e.g. a user's seen
+        filter). Excluded questions are skipped while sampling; if too few others
+        turn up within `max_rounds` draws, excluded ones fill the remaining slots.
+        """
+        size = self.pool_size(pool)
+        k = min(k, size)
+        if k <= 0:
+            return []
+        if exclude is None:
+            return self._fetch_positions(pool, rng.sample(range(size), k))
+
+        chosen, fallback, tried = [], [], set()
+        for _ in range(max_rounds):
+            untried = size - len(tried)
+            want = min(2 * (k - len(chosen)), untried)
+            if want <= 0:
+                break
+            if untried <= 4 * want:
+                # Small pool (or mostly tried): draw from the untried positions directly
+                positions = rng.sample([pos for pos in range(size) if pos not in tried], want)
+            else:
+                drawn = set()
+                while len(drawn) < want:
+                    pos = rng.randrange(size)
+                    if pos not in tried:
+                        drawn.add(pos)
+                positions = list(drawn)
+            tried.update(positions)
+            for question in self._fetch_positions(pool, positions):
+                (fallback if question_id(question) in exclude else chosen).append(question)
+            if len(chosen) >= k:
+                break
+        return (chosen + fallback)[:k]
+
+    def _fetch_positions(self, pool, positions):
+        placeholders = ",".join("?" * len(positions))
+        rows = self._conn().execute(
+            f"SELECT pos, {self.COLUMNS} FROM questions WHERE pool = ? AND pos IN ({placeholders})",
+            (pool, *positions),
+        ).fetchall()
+        by_pos = {row[0]: self._to_question(row[1:]) for row in rows}
+        return [by_pos[pos] for pos in positions if pos in by_pos]
+
+    def difficulty_index(self, pool):
+        """
+        Returns (difficulties, ids) for `pool`, sorted by difficulty, for bisecting.
+        Built once per pool from the (pool, difficulty) index and shared between callers.
+        """
+        index = self._difficulty_indexes.get(pool)
+        if index is None:
+            rows = self._conn().execute(
+                "SELECT difficulty, id FROM questions WHERE pool = ? ORDER BY difficulty, pos", (pool,)
+            ).fetchall()
+            index = ([row[0] for row in rows], [row[1] for row in rows])
+            with self._index_lock:
+                index = self._difficulty_indexes.setdefault(pool, index)
+        return index
+
+    def get(self, question_ids):
+        """Fetches questions by id, preserving the requested order."""
+        question_ids = list(question_ids)
+        if not question_ids:
+            return []
+        by_id = {}
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(question_ids), 500):
+            chunk = question_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self._conn().execute(
+                f"SELECT {self.COLUMNS} FROM questions WHERE id IN ({placeholders})", chunk
+            ):
+                by_id[row[0]] = self._to_question(row)
+        return [by_id[qid] for qid in question_ids if qid in by_id]
+
+    def find(self, role=None, mode=None, custom_set=None, tag=None, difficulty=None):
+        """Iterates over questions matching every given filter, in id order."""
+        clauses, params = [], []
+        for column, value in (("role", role), ("mode", mode), ("set_name", custom_set), ("difficulty", difficulty)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if tag is not None:
+            clauses.append("id IN (SELECT question_id FROM question_tags WHERE tag = ?)")
+            params.append(tag)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        for row in self._conn().execute(f"SELECT {self.COLUMNS} FROM questions {where} ORDER BY id", params):
+            yield self._to_question(row)
+
+    def tags(self, question_ids):
+        """Returns {question_id: [tags]} for the given ids."""
+        question_ids = list(question_ids)
+        result = {qid: [] for qid in question_ids}
+        for start in range(0, len(question_ids), 500):
+            chunk = question_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for tag, qid in self._conn().execute(
+                f"SELECT tag, question_id FROM question_tags WHERE question_id IN ({placeholders})", chunk
+            ):
+                result[qid].append(tag)
+        return result
+
+    @staticmethod
+    def _to_question(row):
+        qid, pool, set_name, role, mode, difficulty, q, options, answer = row
+        return {
+            "id": qid,
+            "q": q,
+            "options": json.loads(options),
+            "answer": answer,
+            "set": set_name,
+            "role": role,
+            "mode": mode,
+            "difficulty": difficulty,
+        }
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank():
+    """
+    Returns the process-wide bank, compiling it from the JSONL source first if it
+    is missing or out of date.
+    """
+    global _bank
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                source_path = os.environ.get("QUESTION_BANK_SOURCE", DEFAULT_SOURCE_PATH)
+                bank_path = os.environ.get("QUESTION_BANK_PATH", DEFAULT_BANK_PATH)
+                if not _is_current(source_path, bank_path):
+                    build_bank(source_path, bank_path)
+                _bank = QuestionBank(bank_path)
+    return _bank
+
+
+def _is_current(source_path, bank_path):
+    if not os.path.exists(bank_path):
+        return False
+    try:
+        conn = sqlite3.connect(f"file:{bank_path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'source_fingerprint'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return False
+    return row is not None and row[0] == source_fingerprint(source_path)
+
+
+def import_questions(input_path, source_path=DEFAULT_SOURCE_PATH, bank_path=DEFAULT_BANK_PATH):
+    """
+    Appends valid, non-duplicate questions from `input_path` to the JSONL source
+    and rebuilds the bank. Returns (imported, skipped).
+    """
+    next_id = 1
+    seen = set()
+    if os.path.exists(source_path):
+        for record in read_jsonl(source_path):
+            next_id = max(next_id, int(record.get("id", 0)) + 1)
+            seen.add((pool_name(record["role"], record["mode"], record["set"]), record["q"].strip().lower()))
+
+    imported = skipped = 0
+    with open(source_path, "a", encoding="utf-8") as out:
+        for record in read_jsonl(input_path):
+            record.setdefault("set", "Standard")
+            error = validate_record(record)
+            key = None if error else (pool_name(record["role"], record["mode"], record["set"]), record["q"].strip().lower())
+            if error or key in seen:
+                skipped += 1
+                continue
+            seen.add(key)
+            record = {
+                "id": next_id,
+                "set": record["set"],
+                "role": record["role"],
+                "mode": record["mode"],
+                "difficulty": int(record.get("difficulty", 2)),
+                "tags": list(record.get("tags", [])),
+                "q": record["q"],
+                "options": record["options"],
+                "answer": record["answer"],
+            }
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            next_id += 1
+            imported += 1
+
+    build_bank(source_path, bank_path)
+    return imported, skipped
+
+
+def export_questions(output, bank, **filters):
+    """Writes matching questions, with their tags, to `output` as JSONL. Returns the count."""
+    count = 0
+    batch = []
+
+    def flush():
+        tags = bank.tags(q["id"] for q in batch)
+        for q in batch:
+            record = {
+                "id": q["id"], "set": q["set"], "role": q["role"], "mode": q["mode"],
+                "difficulty": q["difficulty"], "tags": tags[q["id"]],
+                "q": q["q"], "options": q["options"], "answer": q["answer"],
+            }
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        batch.clear()
+
+    for q in bank.find(**filters):
+        batch.append(q)
+        count += 1
+        if len(batch) >= 500:
+            flush()
+    flush()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the interview question bank.")
+    parser.add_argument("--source", default=os.environ.get("QUESTION_BANK_SOURCE", DEFAULT_SOURCE_PATH))
+    parser.add_argument("--bank", default=os.environ.get("QUESTION_BANK_PATH", DEFAULT_BANK_PATH))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Compile the JSONL source into the SQLite bank")
+    sub.add_parser("stats", help="Show pool sizes")
+    import_parser = sub.add_parser("import", help="Append questions from a JSONL file")
+    import_parser.add_argument("input")
+    export_parser = sub.add_parser("export", help="Export questions as JSONL")
+    export_parser.add_argument("output", help="Output path, or - for stdout")
+    export_parser.add_argument("--role")
+    export_parser.add_argument("--mode")
+    export_parser.add_argument("--set", dest="custom_set")
+    export_parser.add_argument("--tag")
+    export_parser.add_argument("--difficulty", type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build_bank(args.source, args.bank)
+        print(f"Built {args.bank}")
+    elif args.command == "import":
+        imported, skipped = import_questions(args.input, args.source, args.bank)
+        print(f"Imported {imported} questions ({skipped} skipped)")
+    else:
+        if not _is_current(args.source, args.bank):
+            build_bank(args.source, args.bank)
+        bank = QuestionBank(args.bank)
+        if args.command == "stats":
+            for pool, size in sorted(bank.pools().items()):
+                print(f"{size:>8}  {pool}")
+        else:
+            filters = dict(role=args.role, mode=args.mode, custom_set=args.custom_set,
+                           tag=args.tag, difficulty=args.difficulty)
+            if args.output == "-":
+                count = export_questions(sys.stdout, bank, **filters)
+            else:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    count = export_questions(f, bank, **filters)
+            print(f"Exported {count} questions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
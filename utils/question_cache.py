@@ -0,0 +1,120 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "question_cache.sqlite3")
+
+
+def make_key(role, mode, num_qs, custom_set, prompt_version):
+    """Builds the cache key for one AI question request."""
+    return json.dumps([role, mode, int(num_qs), custom_set, prompt_version])
+
+
+class QuestionCache:
+    """
+    Disk-backed cache of AI-generated question sets.
+    Every key keeps a small pool of sets so repeated interviews stay varied.
+    Sets expire after `ttl` seconds and the least recently used keys are
+    evicted once more than `max_keys` are stored.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=7 * 24 * 3600, max_keys=500, pool_size=5):
+        self.path = path
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_keys ("
+                "cache_key TEXT PRIMARY KEY, last_used REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS question_sets ("
+                "id INTEGER PRIMARY KEY, cache_key TEXT NOT NULL, "
+                "payload TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_question_sets_key ON question_sets(cache_key, created_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_keys_last_used ON cache_keys(last_used)"
+            )
+
+    def get_pool(self, key):
+        """Returns every fresh question set stored under `key` (may be empty)."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM question_sets WHERE cache_key = ? AND created_at < ?",
+                (key, now - self.ttl),
+            )
+            rows = self._conn.execute(
+                "SELECT payload FROM question_sets WHERE cache_key = ? ORDER BY id",
+                (key,),
+            ).fetchall()
+            if rows:
+                self._conn.execute(
+                    "UPDATE cache_keys SET last_used = ? WHERE cache_key = ?", (now, key)
+                )
+        return [json.loads(payload) for (payload,) in rows]
+
+    def put(self, key, questions):
+        """Adds a question set to the pool for `key`, trimming the pool and evicting old keys."""
+        now = time.time()
+        payload = json.dumps(questions, separators=(",", ":"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO question_sets (cache_key, payload, created_at) VALUES (?, ?, ?)",
+                (key, payload, now),
+            )
+            self._conn.execute(
+                "INSERT INTO cache_keys (cache_key, last_used) VALUES (?, ?) "
+                "ON CONFLICT(cache_key) DO UPDATE SET last_used = excluded.last_used",
+                (key, now),
+            )
+            # Keep only the newest `pool_size` sets for this key
+            self._conn.execute(
+                "DELETE FROM question_sets WHERE cache_key = ? AND id NOT IN ("
+                "SELECT id FROM question_sets WHERE cache_key = ? ORDER BY id DESC LIMIT ?)",
+                (key, key, self.pool_size),
+            )
+            # Evict least recently used keys beyond the size bound
+            stale = self._conn.execute(
+                "SELECT cache_key FROM cache_keys ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+                (self.max_keys,),
+            ).fetchall()
+            if stale:
+                self._conn.executemany("DELETE FROM question_sets WHERE cache_key = ?", stale)
+                self._conn.executemany("DELETE FROM cache_keys WHERE cache_key = ?", stale)
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM question_sets")
+            self._conn.execute("DELETE FROM cache_keys")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_question_cache():
+    """Returns the process-wide cache, configured from environment variables."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QuestionCache(
+                    path=os.environ.get("QUESTION_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    ttl=float(os.environ.get("QUESTION_CACHE_TTL", 7 * 24 * 3600)),
+                    max_keys=int(os.environ.get("QUESTION_CACHE_MAX_KEYS", 500)),
+                    pool_size=int(os.environ.get("QUESTION_CACHE_POOL_SIZE", 5)),
+                )
+    return _cache
@@ -0,0 +1,96 @@
+"""
+Single-pass parsing and validation of AI-generated multiple-choice questions.
+
+The model's reply is scanned once for complete JSON objects, so valid items
+are salvaged even when the surrounding array is truncated, wrapped in
+markdown, or followed by stray text. Each item is then checked against the
+question schema and lightly repaired where the intent is unambiguous.
+"""
+import re
+
+from utils.question_stream import JSONObjectScanner
+
+NUM_OPTIONS = 4
+_WHITESPACE = re.compile(r"\s+")
+# A bare option letter: "B", "(B)", "B.", "B)" or "B:"
+_LETTER_ANSWER = re.compile(r"\(?([A-Da-d])[).:]?")
+
+
+def _squash(text):
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def validate_question(item):
+    """
+    Returns (question, None) for a valid item, normalized to {"q", "options", "answer"},
+    or (None, reason) if it cannot be used.
+
+    Repairs applied: surrounding whitespace is trimmed, "question" is accepted
+    for "q", and an answer that differs from an option only in case/spacing,
+    or is given as a letter A-D, is mapped to the exact option text.
+    """
+    if not isinstance(item, dict):
+        return None, "item is not an object"
+
+    text = item.get("q", item.get("question"))
+    if not isinstance(text, str) or not text.strip():
+        return None, "missing question text"
+
+    options = item.get("options")
+    if not isinstance(options, list) or not all(isinstance(o, str) and o.strip() for o in options):
+        return None, "options must be a list of non-empty strings"
+    options = [o.strip() for o in options]
+    if len(options) != NUM_OPTIONS:
+        return None, f"expected {NUM_OPTIONS} options, got {len(options)}"
+    if len({_squash(o).lower() for o in options}) != NUM_OPTIONS:
+        return None, "options are not distinct"
+
+    answer = item.get("answer")
+    if not isinstance(answer, str) or not answer.strip():
+        return None, "missing answer"
+    answer = answer.strip()
+    if answer not in options:
+        by_text = {_squash(o).lower(): o for o in options}
+        letter = _LETTER_ANSWER.fullmatch(answer)
+        if _squash(answer).lower() in by_text:
+            answer = by_text[_squash(answer).lower()]
+        elif letter:
+            answer = options["abcd".index(letter.group(1).lower())]
+        else:
+            return None, "answer does not match any option"
+
+    return {"q": text.strip(), "options": options, "answer": answer}, None
+
+
+def iter_candidate_items(objects):
+    """Flattens wrapper objects such as {"questions": [...]} into individual items."""
+    for obj in objects:
+        if isinstance(obj, dict) and isinstance(obj.get("questions"), list):
+            yield from obj["questions"]
+        else:
+            yield obj
+
+
+def parse_questions(text):
+    """
+    Parses a full model reply in one pass.
+    Returns (valid_questions, problems) where problems lists a reason per rejected item.
+    """
+    scanner = JSONObjectScanner()
+    objects = scanner.feed(text)
+    problems = ["malformed JSON object"] * scanner.malformed
+
+    valid = []
+    seen = set()
+    for item in iter_candidate_items(objects):
+        question, reason = validate_question(item)
+        if question is None:
+            problems.append(reason)
+            continue
+        key = _squash(question["q"]).lower()
+        if key in seen:
+            problems.append("duplicate question")
+            continue
+        seen.add(key)
+        valid.append(question)
+    return valid, problems
@@ -0,0 +1,111 @@
+import json
+import threading
+
+
+class JSONObjectScanner:
+    """
+    Incrementally extracts complete top-level JSON objects from streamed text.
+    Anything outside the objects (array brackets, commas, markdown fences) is
+    ignored, so `[{...}, {...}]` can be consumed one object at a time.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.malformed = 0
+
+    def feed(self, text):
+        """Consumes a chunk of text and returns the objects it completed."""
+        completed = []
+        for ch in text:
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._buffer = [ch]
+                continue
+
+            self._buffer.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    raw = "".join(self._buffer)
+                    self._buffer = []
+                    try:
+                        completed.append(json.loads(raw))
+                    except json.JSONDecodeError as e:
+                        self.malformed += 1
+                        print(f"Skipping malformed object in AI stream: {e}")
+        return completed
+
+
+class QuestionStream:
+    """
+    Collects questions from a generator on a background thread so the first
+    question can be shown while the rest are still being produced.
+
+    `questions` only ever grows, so the UI can read it at any time. The
+    generator's return value, if any, becomes `error` (a user-facing message).
+    """
+
+    def __init__(self, expected):
+        self.expected = expected
+        self.questions = []
+        self.error = None
+        self.done = False
+        self._cond = threading.Condition()
+
+    @classmethod
+    def completed(cls, questions, error=None):
+        """Wraps an already available question list."""
+        stream = cls(len(questions))
+        stream.questions.extend(questions)
+        stream.error = error
+        stream.done = True
+        return stream
+
+    def start(self, producer):
+        """Consumes the `producer` generator in a daemon thread."""
+        threading.Thread(target=self._consume, args=(producer,), name="question-stream", daemon=True).start()
+        return self
+
+    def _consume(self, producer):
+        try:
+            while True:
+                try:
+                    question = next(producer)
+                except StopIteration as stop:
+                    self.error = stop.value
+                    break
+                with self._cond:
+                    self.questions.append(question)
+                    self._cond.notify_all()
+        except Exception as e:
+            self.error = f"An unexpected error occurred during AI generation: {e}"
+            print(self.error)
+        finally:
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+
+    def total(self):
+        """Number of questions the interview will have, as far as is known now."""
+        return len(self.questions) if self.done else max(self.expected, len(self.questions))
+
+    def wait_for(self, count, timeout=None):
+        """Blocks until `count` questions are available or the stream ends."""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.questions) >= count or self.done, timeout=timeout)
+            return len(self.questions) >= count
@@ -0,0 +1,188 @@
+"""
+Percentile ranking of a finished interview against past interviews.
+
+Each interview gets a composite score in [0, 1]: difficulty-weighted accuracy
+in which a correct answer earns up to TIME_WEIGHT extra credit for answering
+quickly. Past composite scores are summarized per mode in fixed-bin histogram
+sketches that are updated incrementally from the results store, so a
+percentile lookup costs the same no matter how many attempts are stored.
+With fewer than MIN_POPULATION past interviews the fixed accuracy/time
+thresholds are used instead.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.summary import calculate_ranking
+
+BINS = 1000
+MIN_POPULATION = 30
+DEFAULT_DIFFICULTY = 2
+TIME_WEIGHT = 0.2
+FAST_SECONDS = 15
+SLOW_SECONDS = 120
+
+# (minimum percentile, tier, description), best first
+PERCENTILE_TIERS = [
+    (95, "S-Tier (Godlike)", "Top 5% of candidates. Truly top-tier performance."),
+    (80, "A-Tier (Expert)", "Ahead of most candidates. You're well-prepared for technical challenges."),
+    (50, "B-Tier (Proficient)", "Better than the typical candidate. Focus on speed and the harder questions."),
+    (20, "C-Tier (Competent)", "You have a foundational understanding. Consistent practice will move you up."),
+    (0, "D-Tier (Beginner)", "A good first step. Focus on reviewing fundamentals and trying again."),
+]
+
+
+def composite_score(correct, difficulty=None, elapsed_seconds=None, time_taken=None):
+    """
+    Scores one interview from per-question arrays. Missing difficulties count as
+    DEFAULT_DIFFICULTY; missing per-question times fall back to the interview's
+    average time per question.
+    """
+    correct = np.asarray(correct, dtype=float)
+    if correct.size == 0:
+        return 0.0
+    weights = np.full(correct.size, DEFAULT_DIFFICULTY, dtype=float)
+    if difficulty is not None:
+        given = _to_float_array(difficulty)
+        weights = np.where(np.isnan(given), weights, given)
+
+    fallback = (time_taken / correct.size) if time_taken else SLOW_SECONDS
+    seconds = np.full(correct.size, fallback, dtype=float)
+    if elapsed_seconds is not None:
+        given = _to_float_array(elapsed_seconds)
+        seconds = np.where(np.isnan(given), seconds, given)
+    speed = np.clip((SLOW_SECONDS - seconds) / (SLOW_SECONDS - FAST_SECONDS), 0.0, 1.0)
+
+    credit = correct * ((1 - TIME_WEIGHT) + TIME_WEIGHT * speed)
+    return float((weights * credit).sum() / weights.sum())
+
+
+def _to_float_array(values):
+    """Float array with NaN wherever `values` holds None/NaN/pd.NA."""
+    return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=float)
+
+
+class QuantileSketch:
+    """Fixed-bin histogram over [0, 1]; percentile lookups are O(1) after each update."""
+
+    def __init__(self, bins=BINS):
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self._below = np.zeros(bins + 1, dtype=np.int64)
+
+    @property
+    def total(self):
+        return int(self._below[-1])
+
+    def _index(self, values):
+        return np.clip((np.asarray(values, dtype=float) * self.bins).astype(np.int64), 0, self.bins - 1)
+
+    def add(self, values):
+        self.counts += np.bincount(self._index(values), minlength=self.bins)
+        self._below[1:] = np.cumsum(self.counts)
+
+    def percentile(self, value, exclude=()):
+        """
+        Share of observations below `value`, counting its own bin as half, in percent.
+        Observations listed in `exclude` (already added) are left out of the population.
+        """
+        total = self.total - len(exclude)
+        if total <= 0:
+            return None
+        index = int(self._index([value])[0])
+        below, here = int(self._below[index]), int(self.counts[index])
+        for excluded in self._index(list(exclude)):
+            if excluded < index:
+                below -= 1
+            elif excluded == index:
+                here -= 1
+        return float((below + 0.5 * here) / total * 100)
+
+
+class RankingEngine:
+    """Keeps one sketch per mode (plus an overall one) in sync with the results store's sessions."""
+
+    def __init__(self, store):
+        self.store = store
+        self._sketches = {}
+        self._folded = set()
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Folds in session parts written since the last refresh; rebuilds after a compaction."""
+        frames = self.store.sessions.frames()
+        with self._lock:
+            if self._folded - set(frames):
+                self._sketches = {}
+                self._folded = set()
+            new = [name for name in frames if name not in self._folded]
+            for name in new:
+                frame = frames[name]
+                scores = self._session_scores(frame)
+                self._sketch(None).add(scores)
+                for mode, mode_scores in zip(*self._group(frame["mode"].to_numpy(), scores)):
+                    self._sketch(mode).add(mode_scores)
+                self._folded.add(name)
+
+    @staticmethod
+    def _session_scores(frame):
+        if "composite" in frame:
+            return frame["composite"].to_numpy(dtype=float)
+        # Parts written before composite scores were stored: plain accuracy
+        return frame["accuracy"].to_numpy(dtype=float)
+
+    @staticmethod
+    def _group(modes, scores):
+        keys, inverse = np.unique(modes.astype(str), return_inverse=True)
+        return keys, [scores[inverse == i] for i in range(len(keys))]
+
+    def _sketch(self, mode):
+        if mode not in self._sketches:
+            self._sketches[mode] = QuantileSketch()
+        return self._sketches[mode]
+
+    def percentile(self, score, mode=None, session_id=None):
+        """
+        Percentile of `score` among past interviews of `mode` (or all, if that mode has too
+        little history). If `session_id` has already been recorded, it is left out of the population.
+        """
+        self.refresh()
+        own = self.store.session_index().get(session_id) if session_id is not None else None
+        with self._lock:
+            sketch, exclude = self._sketches.get(mode), ()
+            if own is not None and own[0] == mode:
+                exclude = (own[1],)
+            if sketch is None or sketch.total - len(exclude) < MIN_POPULATION:
+                sketch, exclude = self._sketches.get(None), () if own is None else (own[1],)
+            if sketch is None or sketch.total - len(exclude) < MIN_POPULATION:
+                return None
+            return sketch.percentile(score, exclude)
+
+    def rank(self, correct, difficulty, elapsed_seconds, time_taken, mode=None, session_id=None):
+        """Returns (tier, description) for a finished interview, ranked against the other stored interviews."""
+        total = len(correct)
+        if total == 0:
+            return "N/A", "Complete an interview to get a rank."
+        score = composite_score(correct, difficulty, elapsed_seconds, time_taken)
+        percentile = self.percentile(score, mode, session_id)
+        if percentile is None:
+            return calculate_ranking(int(np.sum(correct)), total, time_taken)
+        for minimum, tier, description in PERCENTILE_TIERS:
+            if percentile >= minimum:
+                return tier, f"{description} You scored better than {min(percentile, 99):.0f}% of past interviews."
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_ranking_engine():
+    """Returns the process-wide ranking engine over the shared results store."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                from utils.results_store import get_results_store
+                _engine = RankingEngine(get_results_store())
+    return _engine
@@ -1,29 +1,84 @@
+import io
+from functools import lru_cache
 from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import simpleSplit
 from reportlab.pdfgen import canvas
+from utils import metrics
+
+FONT = "Helvetica"
+FONT_SIZE = 10
+LINE_HEIGHT = 15
+MARGIN = 50
+
 
 def generate_report(questions, answers, feedback):
-    pdf_path = "interview_report.pdf"
-    c = canvas.Canvas(pdf_path, pagesize=letter)
+    """
+    Renders the interview report and returns the PDF as bytes.
+    Reports are memoized on their content, so Streamlit reruns of the
+    summary page reuse the PDF instead of rendering it again.
+    """
+    metrics.inc("pdf_report_requests_total")
+    return _render_report(
+        tuple(questions),
+        tuple(answers),
+        tuple((fb["feedback"], fb["score"]) for fb in feedback),
+    )
+
+
+@lru_cache(maxsize=128)
+def _render_report(questions, answers, feedback):
+    with metrics.timer("pdf_render_seconds"):
+        return _draw_report(questions, answers, feedback)
+
+
+def _draw_report(questions, answers, feedback, title="Interview Report", header=()):
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
     width, height = letter
-    y = height - 50
+    y = height - MARGIN
 
     c.setFont("Helvetica-Bold", 14)
-    c.drawString(50, y, "Interview Report")
+    c.drawString(MARGIN, y, title)
     y -= 30
 
-    c.setFont("Helvetica", 10)
-    for i, (q, ans, fb) in enumerate(zip(questions, answers, feedback)):
-        c.drawString(50, y, f"Q{i+1}: {q}")
-        y -= 15
-        c.drawString(70, y, f"Answer: {ans}")
-        y -= 15
-        c.drawString(70, y, f"Feedback: {fb['feedback']}")
-        y -= 15
-        c.drawString(70, y, f"Score: {fb['score']}/10")
-        y -= 25
-        if y < 100:  # New page
-            c.showPage()
-            y = height - 50
+    def draw_wrapped(text, indent):
+        # Wrap long lines to the page width instead of letting drawString clip them
+        nonlocal y
+        for line in simpleSplit(text, FONT, FONT_SIZE, width - indent - MARGIN) or [""]:
+            if y < 100:  # New page
+                c.showPage()
+                y = height - MARGIN
+            c.setFont(FONT, FONT_SIZE)
+            c.drawString(indent, y, line)
+            y -= LINE_HEIGHT
+
+    for line in header:
+        draw_wrapped(line, MARGIN)
+    if header:
+        y -= 10
+
+    for i, (q, ans, (fb_text, score)) in enumerate(zip(questions, answers, feedback)):
+        draw_wrapped(f"Q{i+1}: {q}", MARGIN)
+        draw_wrapped(f"Answer: {ans}", MARGIN + 20)
+        draw_wrapped(f"Feedback: {fb_text}", MARGIN + 20)
+        draw_wrapped(f"Score: {score}/10", MARGIN + 20)
+        y -= 10
 
     c.save()
-    return pdf_path
+    return buffer.getvalue()
+
+
+def generate_candidate_report(header, questions, answers, feedback):
+    """
+    Renders one stored interview for a cohort export; `header` lines describe the
+    candidate. Not memoized, since each report is rendered once.
+    """
+    return _draw_report(
+        tuple(questions), tuple(answers), tuple((fb["feedback"], fb["score"]) for fb in feedback),
+        title="Candidate Report", header=tuple(header),
+    )
+
+
+def generate_cohort_report(header, rows):
+    """Renders the cohort summary: `header` lines, then one line per entry in `rows`."""
+    return _draw_report((), (), (), title="Cohort Report", header=tuple(header) + ("",) + tuple(rows))
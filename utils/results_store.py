@@ -0,0 +1,423 @@
+"""
+Append-only store of finished interviews, kept as Parquet part files.
+
+Layout under RESULTS_STORE_PATH (default .cache/results):
+    attempts/        one row per answered question (outcome, timing, difficulty)
+    sessions/        one row per finished interview (score, accuracy, time)
+    question_stats/  pre-aggregated per-question counts, one small part per interview
+
+Every write adds new part files and never rewrites existing ones, so several
+app replicas can share the directory. Readers load each part once and keep it
+in memory, folding in only the parts that appeared since the last query.
+
+`compact()` merges small parts (summing the question_stats partials) to keep
+the file count low. It holds an exclusive lock on the directory (fcntl.flock;
+on hosts without fcntl, a lock that only covers the current process), so
+replicas never merge the same parts twice. A merged part is published together with a
+list of the parts it replaces, so readers skip those parts even before they are
+deleted. Once more than RESULTS_COMPACT_THRESHOLD small parts pile up, the app
+compacts on a background thread; run it by hand with
+`python -m utils.results_store compact`.
+"""
+import argparse
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+from utils.question_bank import question_id
+from utils.ranking import composite_score
+
+DEFAULT_RESULTS_PATH = os.path.join(".cache", "results")
+COMPACT_THRESHOLD = 64
+# Parts at least this large are left alone by compaction, so no compaction rewrites the whole history
+COMPACT_PART_BYTES = 8 * 1024 * 1024
+SOURCES_SUFFIX = ".sources"
+
+ATTEMPT_COLUMNS = [
+    "session_id", "user_id", "finished_at", "role", "mode", "custom_set",
+    "position", "question_id", "difficulty", "correct", "skipped", "elapsed_ms",
+]
+SESSION_COLUMNS = [
+    "session_id", "user_id", "finished_at", "role", "mode", "custom_set",
+    "score", "total", "accuracy", "time_taken", "composite",
+]
+QUESTION_STAT_COLUMNS = ["question_id", "question", "attempts", "correct", "skipped", "elapsed_ms_sum", "timed_attempts"]
+QUESTION_STAT_SUMS = QUESTION_STAT_COLUMNS[2:]
+
+# Stands in for the directory lock where fcntl is unavailable
+_local_compaction_lock = threading.Lock()
+
+
+@contextmanager
+def _compaction_lock(path, blocking):
+    """Holds the store's exclusive compaction lock; yields False if blocking=False and it is taken."""
+    if fcntl is None:
+        acquired = _local_compaction_lock.acquire(blocking)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                _local_compaction_lock.release()
+        return
+    with open(os.path.join(path, ".compact.lock"), "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        # Released when the file is closed
+        yield True
+
+
+class _PartedDataset:
+    """A directory of immutable Parquet parts, cached in memory part by part."""
+
+    def __init__(self, path):
+        self.path = path
+        self._frames = {}
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def parts(self):
+        """Current part names, leaving out parts already merged into a published compacted part."""
+        names = os.listdir(self.path)
+        parts = {name for name in names if name.endswith(".parquet")}
+        for name in names:
+            if name.endswith(SOURCES_SUFFIX) and name[:-len(SOURCES_SUFFIX)] in parts:
+                parts.difference_update(self._sources(name))
+        return sorted(parts)
+
+    def small_parts(self, max_bytes):
+        small = []
+        for name in self.parts():
+            try:
+                if os.path.getsize(os.path.join(self.path, name)) < max_bytes:
+                    small.append(name)
+            except FileNotFoundError:
+                continue
+        return small
+
+    def _sources(self, sources_name):
+        try:
+            with open(os.path.join(self.path, sources_name)) as f:
+                return f.read().split()
+        except FileNotFoundError:
+            # The compaction finished (its sources are already gone) after the directory was listed
+            return []
+
+    def _write_atomic(self, name, write):
+        tmp_path = os.path.join(self.path, f".{name}.tmp")
+        write(tmp_path)
+        os.replace(tmp_path, os.path.join(self.path, name))
+
+    def append(self, frame):
+        name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+        self._write_atomic(name, lambda path: frame.to_parquet(path, index=False))
+        return name
+
+    def read(self, names, filters=None):
+        """Reads parts straight from disk, bypassing the cache; `filters` is passed to pd.read_parquet."""
+        return [pd.read_parquet(os.path.join(self.path, name), filters=filters) for name in names]
+
+    def frames(self):
+        """Returns {part name: DataFrame}, reading only parts not seen before."""
+        parts = self.parts()
+        with self._lock:
+            for name in set(self._frames) - set(parts):
+                del self._frames[name]
+            for name in parts:
+                if name not in self._frames:
+                    try:
+                        self._frames[name] = pd.read_parquet(os.path.join(self.path, name))
+                    except FileNotFoundError:
+                        # Removed by a concurrent compaction; its rows live in the compacted part
+                        continue
+            return dict(self._frames)
+
+    def replace(self, names, frame):
+        """
+        Writes `frame` as one new part, then removes the parts it was built from.
+        The source list is written first and the new part only becomes visible
+        afterwards, so a reader never counts the merged rows twice. Callers hold
+        the compaction lock.
+        """
+        name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+
+        def write_sources(path):
+            with open(path, "w") as f:
+                f.write("\n".join(names))
+
+        self._write_atomic(name + SOURCES_SUFFIX, write_sources)
+        self._write_atomic(name, lambda path: frame.to_parquet(path, index=False))
+        self._finish_replace(name + SOURCES_SUFFIX)
+        return name
+
+    def _finish_replace(self, sources_name):
+        for name in self._sources(sources_name):
+            try:
+                os.remove(os.path.join(self.path, name))
+            except FileNotFoundError:
+                pass
+        os.remove(os.path.join(self.path, sources_name))
+
+    def recover(self):
+        """Completes or discards replacements interrupted by a crash. Callers hold the compaction lock."""
+        names = set(os.listdir(self.path))
+        for name in names:
+            if not name.endswith(SOURCES_SUFFIX):
+                continue
+            if name[:-len(SOURCES_SUFFIX)] in names:
+                self._finish_replace(name)
+            else:
+                # The merged part was never published; its sources are still the live parts
+                os.remove(os.path.join(self.path, name))
+
+
+def _append_frames(value, frames):
+    # Empty frames are left out so the result keeps the dtypes of the stored parts
+    frames = [frame for frame in (value, *frames) if len(frame)]
+    return pd.concat(frames, ignore_index=True) if frames else value
+
+
+def _index_sessions(index, frames):
+    for frame in frames:
+        # Parts written before composite scores were stored rank by plain accuracy
+        scores = frame["composite"] if "composite" in frame else frame["accuracy"]
+        index.update(zip(frame["session_id"], zip(frame["mode"], scores.astype(float))))
+    return index
+
+
+def _sum_question_stats(frames):
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return pd.DataFrame(columns=QUESTION_STAT_COLUMNS)
+    combined = pd.concat(frames, ignore_index=True)
+    return combined.groupby("question_id", as_index=False).agg(
+        question=("question", "first"), **{col: (col, "sum") for col in QUESTION_STAT_SUMS}
+    )[QUESTION_STAT_COLUMNS]
+
+
+class ResultsStore:
+    def __init__(self, path=DEFAULT_RESULTS_PATH, compact_threshold=COMPACT_THRESHOLD,
+                 compact_part_bytes=COMPACT_PART_BYTES):
+        self.path = path
+        self.compact_threshold = compact_threshold
+        self.compact_part_bytes = compact_part_bytes
+        self._compacting = threading.Event()
+        self.attempts = _PartedDataset(os.path.join(path, "attempts"))
+        self.sessions = _PartedDataset(os.path.join(path, "sessions"))
+        self.question_stats = _PartedDataset(os.path.join(path, "question_stats"))
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    def record_interview(self, session_id, user_id, meta, questions, outcomes, time_taken, finished_at=None):
+        """
+        Appends one finished interview. `outcomes` holds one dict per answered question
+        with "correct", "skipped" and an optional "elapsed_ms". Recording the same
+        session twice is a no-op.
+        """
+        if self.has_session(session_id):
+            return False
+        finished_at = finished_at or time.time()
+        rows = []
+        for position, (q, outcome) in enumerate(zip(questions, outcomes)):
+            rows.append({
+                "session_id": session_id, "user_id": user_id, "finished_at": finished_at,
+                "role": meta["role"], "mode": meta["mode"], "custom_set": meta["custom_set"],
+                "position": position, "question_id": question_id(q), "question": q["q"],
+                "difficulty": q.get("difficulty"), "correct": bool(outcome["correct"]),
+                "skipped": bool(outcome["skipped"]), "elapsed_ms": outcome.get("elapsed_ms"),
+            })
+        attempts = pd.DataFrame(rows, columns=ATTEMPT_COLUMNS + ["question"])
+        attempts["difficulty"] = attempts["difficulty"].astype("Int8")
+        attempts["elapsed_ms"] = attempts["elapsed_ms"].astype("Int64")
+
+        score = int(attempts["correct"].sum())
+        total = len(questions)
+        session = pd.DataFrame([{
+            "session_id": session_id, "user_id": user_id, "finished_at": finished_at,
+            "role": meta["role"], "mode": meta["mode"], "custom_set": meta["custom_set"],
+            "score": score, "total": total, "accuracy": score / total if total else 0.0,
+            "time_taken": float(time_taken),
+            "composite": composite_score(
+                attempts["correct"], attempts["difficulty"], attempts["elapsed_ms"] / 1000, time_taken
+            ),
+        }], columns=SESSION_COLUMNS)
+
+        timed = attempts["elapsed_ms"].notna()
+        stats = attempts.assign(
+            attempts=1,
+            correct=attempts["correct"].astype("int64"),
+            skipped=attempts["skipped"].astype("int64"),
+            elapsed_ms_sum=attempts["elapsed_ms"].fillna(0).astype("int64"),
+            timed_attempts=timed.astype("int64"),
+        ).groupby("question_id", as_index=False).agg(
+            question=("question", "first"), **{col: (col, "sum") for col in QUESTION_STAT_SUMS}
+        )
+
+        self.attempts.append(attempts[ATTEMPT_COLUMNS])
+        self.question_stats.append(stats[QUESTION_STAT_COLUMNS])
+        self.sessions.append(session)
+        if len(self.attempts.small_parts(self.compact_part_bytes)) > self.compact_threshold:
+            self.compact_in_background()
+        return True
+
+    def _folded(self, name, dataset, fold, empty):
+        """
+        A value built from a dataset's parts and cached under `name`. Only parts added since
+        the last call are passed to `fold(value, frames)`; the value is rebuilt from `empty()`
+        when a part disappears (a compaction merged it into a new one).
+        """
+        frames = dataset.frames()
+        with self._cache_lock:
+            folded, value = self._cache.get(name, (frozenset(), None))
+            if value is None or not folded <= frames.keys():
+                folded, value = frozenset(), empty()
+            new = [frames[part] for part in sorted(frames.keys() - folded)]
+            if new:
+                value = fold(value, new)
+            self._cache[name] = (frozenset(frames), value)
+            return value
+
+    def session_frame(self):
+        return self._folded("sessions", self.sessions, _append_frames, lambda: pd.DataFrame(columns=SESSION_COLUMNS))
+
+    def attempts_frame(self):
+        return self._folded("attempts", self.attempts, _append_frames, lambda: pd.DataFrame(columns=ATTEMPT_COLUMNS))
+
+    def read_attempts(self, session_ids):
+        """
+        Attempt rows of the given sessions only, read part by part with a row filter
+        and not kept in memory, for batch jobs that walk many sessions.
+        """
+        filters = [("session_id", "in", list(session_ids))]
+        while True:
+            try:
+                frames = [frame for frame in self.attempts.read(self.attempts.parts(), filters) if len(frame)]
+                break
+            except FileNotFoundError:
+                # A compaction replaced a part while it was being read; list the parts again
+                continue
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=ATTEMPT_COLUMNS)
+
+    def question_stats_frame(self):
+        return self._folded(
+            "question_stats", self.question_stats,
+            lambda value, frames: _sum_question_stats([value, *frames]),
+            lambda: pd.DataFrame(columns=QUESTION_STAT_COLUMNS),
+        )
+
+    def session_index(self):
+        """{session_id: (mode, composite score)} for every stored interview, updated part by part."""
+        return self._folded("session_index", self.sessions, _index_sessions, dict)
+
+    def has_session(self, session_id):
+        return session_id in self.session_index()
+
+    def user_trend(self, user_id, limit=50):
+        """The user's most recent interviews, oldest first, with a rolling accuracy."""
+        sessions = self.session_frame()
+        trend = sessions[sessions["user_id"] == user_id].sort_values("finished_at").tail(limit).copy()
+        trend["rolling_accuracy"] = trend["accuracy"].rolling(5, min_periods=1).mean()
+        trend["finished_at"] = pd.to_datetime(trend["finished_at"], unit="s")
+        return trend.reset_index(drop=True)
+
+    def question_difficulty(self, min_attempts=5):
+        """Per-question success rates from the rollups, hardest first."""
+        stats = self.question_stats_frame()
+        stats = stats[stats["attempts"] >= min_attempts].copy()
+        stats["accuracy"] = stats["correct"] / stats["attempts"]
+        stats["skip_rate"] = stats["skipped"] / stats["attempts"]
+        stats["avg_elapsed_ms"] = stats["elapsed_ms_sum"] / stats["timed_attempts"].where(stats["timed_attempts"] > 0)
+        return stats.sort_values(["accuracy", "attempts"], ascending=[True, False]).reset_index(drop=True)
+
+    def percentile_rank(self, accuracy, mode=None):
+        """Share of past interviews (optionally of one mode) with a lower accuracy, in percent."""
+        sessions = self.session_frame()
+        if mode is not None:
+            sessions = sessions[sessions["mode"] == mode]
+        if sessions.empty:
+            return None
+        values = sessions["accuracy"].to_numpy()
+        return float(((values < accuracy).sum() + 0.5 * (values == accuracy).sum()) / len(values) * 100)
+
+    def compact(self, blocking=True):
+        """
+        Merges each dataset's small parts into one, summing the question_stats partials.
+        Runs under an exclusive lock on the store directory; with blocking=False it
+        returns False straight away if another process or thread is compacting.
+        """
+        with _compaction_lock(self.path, blocking) as acquired:
+            if not acquired:
+                return False
+            for dataset in (self.attempts, self.sessions, self.question_stats):
+                dataset.recover()
+                # Listed only now, under the lock, so parts merged by another compaction are not merged again
+                names = dataset.small_parts(self.compact_part_bytes)
+                if len(names) < 2:
+                    continue
+                frames = dataset.read(names)
+                if dataset is self.question_stats:
+                    merged = _sum_question_stats(frames)
+                else:
+                    merged = pd.concat(frames, ignore_index=True)
+                dataset.replace(names, merged)
+        return True
+
+    def compact_in_background(self):
+        """Starts a non-blocking compaction on a daemon thread, unless this store already has one running."""
+        if self._compacting.is_set():
+            return
+        self._compacting.set()
+
+        def run():
+            try:
+                self.compact(blocking=False)
+            except Exception as e:
+                print(f"Error compacting results store: {e}")
+            finally:
+                self._compacting.clear()
+
+        threading.Thread(target=run, name="results-compaction", daemon=True).start()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_results_store():
+    """Returns the process-wide results store, configured from environment variables."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResultsStore(
+                    path=os.environ.get("RESULTS_STORE_PATH", DEFAULT_RESULTS_PATH),
+                    compact_threshold=int(os.environ.get("RESULTS_COMPACT_THRESHOLD", COMPACT_THRESHOLD)),
+                )
+    return _store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain and inspect the interview results store.")
+    parser.add_argument("command", choices=("compact", "stats"))
+    args = parser.parse_args(argv)
+    store = get_results_store()
+    if args.command == "compact":
+        store.compact()
+    sessions = store.session_frame()
+    print(f"{len(sessions)} interviews, {sessions['user_id'].nunique()} users, "
+          f"{len(store.attempts.parts())} attempt parts, {len(store.question_stats_frame())} questions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Adaptive question scheduling.
+
+The candidate's ability is tracked on the bank's difficulty scale with an
+Elo-style update: after each answer it moves towards harder questions when the
+answer was more correct than expected and towards easier ones otherwise. The
+next question is the unused one whose difficulty is closest to the current
+ability, found by bisecting the pool's difficulty-sorted index, so each step
+costs O(log n) plus the handful of questions already used (or excluded,
+e.g. seen by the candidate in an earlier session).
+"""
+import bisect
+import math
+import random
+
+MIN_DIFFICULTY = 1
+MAX_DIFFICULTY = 3
+START_ABILITY = 2.0
+K_FACTOR = 0.6
+SLOPE = 1.7
+
+
+def expected_score(ability, difficulty):
+    """Probability of a correct answer under a logistic (Rasch) model."""
+    return 1 / (1 + math.exp(-SLOPE * (ability - difficulty)))
+
+
+class AdaptiveScheduler:
+    """
+    Picks questions one at a time from a pool's (difficulties, ids) index.
+    `difficulties` must be sorted; the index is shared and never modified.
+    """
+
+    def __init__(self, difficulties, ids, ability=START_ABILITY, rng=random, exclude=None):
+        self.difficulties = difficulties
+        self.ids = ids
+        self.exclude = exclude
+        self.ability = ability
+        self.rng = rng
+        self.used = set()
+        self.history = []  # (question id, difficulty, correct)
+        self._last = None
+
+    def next_id(self):
+        """Returns the id of the unused question closest to the current ability, or None if the pool is exhausted."""
+        if len(self.used) >= len(self.ids):
+            return None
+        target = min(max(round(self.ability), MIN_DIFFICULTY), MAX_DIFFICULTY)
+        if self.exclude is not None:
+            index = self._find(target, lambda i: i in self.used or str(self.ids[i]) in self.exclude)
+            if index is not None:
+                return self._take(index)
+        # Without exclusions (or when every unused question is excluded), only skip used ones
+        index = self._find(target, self.used.__contains__)
+        return None if index is None else self._take(index)
+
+    def _find(self, target, skip):
+        n = len(self.ids)
+        lo = bisect.bisect_left(self.difficulties, target)
+        hi = bisect.bisect_right(self.difficulties, target)
+        if lo < hi:
+            # Random start within the matching band so repeated interviews differ
+            start = self.rng.randrange(lo, hi)
+            for offset in range(hi - lo):
+                index = lo + (start - lo + offset) % (hi - lo)
+                if not skip(index):
+                    return index
+        # Band exhausted or empty: walk outwards to the nearest unused difficulty
+        left, right = lo - 1, hi
+        while left >= 0 or right < n:
+            left_gap = target - self.difficulties[left] if left >= 0 else math.inf
+            right_gap = self.difficulties[right] - target if right < n else math.inf
+            if left_gap <= right_gap:
+                if not skip(left):
+                    return left
+                left -= 1
+            else:
+                if not skip(right):
+                    return right
+                right += 1
+        return None
+
+    def _take(self, index):
+        self.used.add(index)
+        self._last = index
+        return self.ids[index]
+
+    def record(self, correct):
+        """Updates the ability estimate with the outcome of the last question returned by next_id."""
+        difficulty = self.difficulties[self._last]
+        self.ability += K_FACTOR * (float(correct) - expected_score(self.ability, difficulty))
+        self.ability = min(max(self.ability, MIN_DIFFICULTY - 0.5), MAX_DIFFICULTY + 0.5)
+        self.history.append((self.ids[self._last], difficulty, bool(correct)))
+
+    def replay(self, question_ids, outcomes):
+        """Rebuilds the state of a restored interview from the questions asked and their outcomes."""
+        positions = {qid: index for index, qid in enumerate(self.ids)}
+        for qid, correct in zip(question_ids, outcomes):
+            if qid in positions:
+                self._take(positions[qid])
+                self.record(correct)
+        for qid in question_ids[len(outcomes):]:
+            if qid in positions:
+                self._take(positions[qid])
@@ -0,0 +1,189 @@
+"""
+Tracking which questions a user has already been served, and spotting
+near-duplicate generated questions.
+
+Each user's seen-set is a fixed-size Bloom filter over question ids
+(utils.question_bank.question_id), persisted in SQLite, so it costs
+SEEN_FILTER_BITS / 8 bytes per user no matter how many interviews they take.
+False positives only make a question look seen, which at worst skips it. Once
+a filter holds more ids than it was sized for it is cleared, so a user who
+has worked through a whole pool starts seeing its questions again.
+
+Configured from the environment:
+    SEEN_STORE_PATH     SQLite file (default .cache/seen.sqlite3)
+    SEEN_FILTER_BITS    bits per user filter (default 8192)
+    SEEN_FILTER_HASHES  hash functions per key (default 5)
+"""
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from utils.minhash import LSHIndex, MinHasher
+
+DEFAULT_SEEN_PATH = os.path.join(".cache", "seen.sqlite3")
+DEFAULT_BITS = 8192
+DEFAULT_HASHES = 5
+NEAR_DUPLICATE_THRESHOLD = 0.75
+NUM_PERM = 128
+
+
+class BloomFilter:
+    def __init__(self, num_bits=DEFAULT_BITS, num_hashes=DEFAULT_HASHES, bits=None, count=0):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bytearray(bits) if bits is not None else bytearray((num_bits + 7) // 8)
+        self.count = count
+
+    @property
+    def capacity(self):
+        """Number of keys the filter holds at roughly a 1% false-positive rate."""
+        return int(self.num_bits * (math.log(2) ** 2) / -math.log(0.01))
+
+    def _positions(self, key):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        """Adds `key`; returns False if it was (probably) present already."""
+        added = False
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def clear(self):
+        self.bits = bytearray(len(self.bits))
+        self.count = 0
+
+
+class SeenStore:
+    """Per-user Bloom filters in SQLite, with a small in-process cache of recently used filters."""
+
+    def __init__(self, path=DEFAULT_SEEN_PATH, num_bits=DEFAULT_BITS, num_hashes=DEFAULT_HASHES, cache_size=1024):
+        self.path = path
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.cache_size = cache_size
+        self._filters = OrderedDict()
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen_filters ("
+                "user_id TEXT PRIMARY KEY, num_bits INTEGER NOT NULL, num_hashes INTEGER NOT NULL, "
+                "item_count INTEGER NOT NULL, bits BLOB NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _load(self, user_id):
+        bloom = self._filters.get(user_id)
+        if bloom is not None:
+            self._filters.move_to_end(user_id)
+            return bloom
+        row = self._conn.execute(
+            "SELECT num_bits, num_hashes, item_count, bits FROM seen_filters WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if row is not None and (row[0], row[1]) == (self.num_bits, self.num_hashes):
+            bloom = BloomFilter(row[0], row[1], bits=row[3], count=row[2])
+        else:
+            # Unknown user, or the filter was sized differently: start afresh
+            bloom = BloomFilter(self.num_bits, self.num_hashes)
+        self._filters[user_id] = bloom
+        while len(self._filters) > self.cache_size:
+            self._filters.popitem(last=False)
+        return bloom
+
+    def get(self, user_id):
+        """Returns a snapshot of the user's filter; `question_id in filter` tests membership."""
+        with self._lock:
+            bloom = self._load(user_id)
+            return BloomFilter(bloom.num_bits, bloom.num_hashes, bits=bloom.bits, count=bloom.count)
+
+    def mark(self, user_id, question_ids):
+        """Records questions as seen by the user."""
+        with self._lock:
+            bloom = self._load(user_id)
+            if bloom.count + len(question_ids) > bloom.capacity:
+                bloom.clear()
+            changed = [bloom.add(qid) for qid in question_ids]
+            if not any(changed):
+                return
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO seen_filters "
+                    "(user_id, num_bits, num_hashes, item_count, bits, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (user_id, bloom.num_bits, bloom.num_hashes, bloom.count, bytes(bloom.bits), time.time()),
+                )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_seen_store():
+    """Returns the process-wide seen store, configured from environment variables."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SeenStore(
+                    path=os.environ.get("SEEN_STORE_PATH", DEFAULT_SEEN_PATH),
+                    num_bits=int(os.environ.get("SEEN_FILTER_BITS", DEFAULT_BITS)),
+                    num_hashes=int(os.environ.get("SEEN_FILTER_HASHES", DEFAULT_HASHES)),
+                )
+    return _store
+
+
+# Word bigrams: trigrams are too coarse for short questions, and single words make
+# questions that differ in their one key term ("list and a set" / "list and a tuple") look alike
+_hasher = MinHasher(num_perm=NUM_PERM, shingle_size=2)
+
+
+@lru_cache(maxsize=4096)
+def _signature(text):
+    return _hasher.signature(text)
+
+
+class NearDuplicateFilter:
+    """
+    Admits question texts one at a time, rejecting any whose MinHash similarity
+    to an already admitted text reaches `threshold`.
+    """
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self._index = LSHIndex(num_perm=NUM_PERM, bands=32)
+        self._signatures = []
+
+    def admit(self, text):
+        signature = _signature(text)
+        for candidate in self._index.candidates(signature):
+            if MinHasher.similarity(signature, self._signatures[candidate]) >= self.threshold:
+                return False
+        self._index.add(len(self._signatures), signature)
+        self._signatures.append(signature)
+        return True
+
+
+def dedupe_questions(questions, threshold=NEAR_DUPLICATE_THRESHOLD):
+    """Drops questions that are near-duplicates of an earlier one in the list."""
+    near_duplicates = NearDuplicateFilter(threshold)
+    return [q for q in questions if near_duplicates.admit(q["q"])]
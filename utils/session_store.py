@@ -0,0 +1,301 @@
+"""
+Persistence for in-progress interviews, so a session survives a page reload,
+an app restart, or being routed to another replica.
+
+A session is stored as three parts, each written separately:
+    meta       settings and start time, written once when the interview starts
+    questions  appended as they become available (AI questions stream in)
+    answers    one compact record appended per Submit/Skip
+
+Checkpoints therefore only write the new record instead of re-serializing the
+whole session. Backends are chosen with SESSION_STORE:
+    memory (default)  process-local; survives reloads but not restarts
+    sqlite            SESSION_STORE_PATH (default .cache/sessions.sqlite3)
+    redis             SESSION_STORE_URL (default redis://localhost:6379/0)
+Sessions expire SESSION_TTL seconds after their last write (default 24h).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_STORE_PATH = os.path.join(".cache", "sessions.sqlite3")
+DEFAULT_TTL = 24 * 3600
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(",", ":"))
+
+
+class SessionStore:
+    """Interface shared by the backends. `load` returns None for unknown or expired sessions."""
+
+    def create(self, session_id, meta, questions):
+        raise NotImplementedError
+
+    def add_questions(self, session_id, questions, start):
+        """Stores questions[start:], numbered from `start`."""
+        raise NotImplementedError
+
+    def append_answer(self, session_id, position, record):
+        """Stores the answer record for question `position`. Rewriting a position is harmless."""
+        raise NotImplementedError
+
+    def load(self, session_id):
+        """Returns {"meta", "questions", "answers"} or None."""
+        raise NotImplementedError
+
+    def delete(self, session_id):
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        stale = [sid for sid, session in self._sessions.items() if session["updated_at"] < now - self.ttl]
+        for sid in stale:
+            del self._sessions[sid]
+
+    def create(self, session_id, meta, questions):
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            self._sessions[session_id] = {
+                "meta": _dumps(meta),
+                "questions": [_dumps(q) for q in questions],
+                "answers": {},
+                "updated_at": now,
+            }
+
+    def add_questions(self, session_id, questions, start):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            del session["questions"][start:]
+            session["questions"].extend(_dumps(q) for q in questions[start:])
+            session["updated_at"] = time.time()
+
+    def append_answer(self, session_id, position, record):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            session["answers"][position] = _dumps(record)
+            session["updated_at"] = time.time()
+
+    def load(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session["updated_at"] < time.time() - self.ttl:
+                return None
+            return {
+                "meta": json.loads(session["meta"]),
+                "questions": [json.loads(q) for q in session["questions"]],
+                "answers": [json.loads(session["answers"][pos]) for pos in sorted(session["answers"])],
+            }
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """One row per session plus one row per question and per answer, so every checkpoint is a single small insert."""
+
+    def __init__(self, path=DEFAULT_STORE_PATH, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, meta TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_records ("
+                "session_id TEXT NOT NULL, kind TEXT NOT NULL, position INTEGER NOT NULL, "
+                "payload TEXT NOT NULL, PRIMARY KEY (session_id, kind, position))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions(updated_at)"
+            )
+
+    def _touch(self, session_id, now):
+        return self._conn.execute(
+            "UPDATE sessions SET updated_at = ? WHERE session_id = ?", (now, session_id)
+        ).rowcount
+
+    def create(self, session_id, meta, questions):
+        now = time.time()
+        with self._lock, self._conn:
+            # Expired sessions are purged lazily whenever a new one starts
+            stale = self._conn.execute(
+                "SELECT session_id FROM sessions WHERE updated_at < ?", (now - self.ttl,)
+            ).fetchall()
+            if stale:
+                self._conn.executemany("DELETE FROM session_records WHERE session_id = ?", stale)
+                self._conn.executemany("DELETE FROM sessions WHERE session_id = ?", stale)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, meta, updated_at) VALUES (?, ?, ?)",
+                (session_id, _dumps(meta), now),
+            )
+            self._conn.execute("DELETE FROM session_records WHERE session_id = ?", (session_id,))
+            self._conn.executemany(
+                "INSERT INTO session_records (session_id, kind, position, payload) VALUES (?, 'q', ?, ?)",
+                [(session_id, pos, _dumps(q)) for pos, q in enumerate(questions)],
+            )
+
+    def add_questions(self, session_id, questions, start):
+        with self._lock, self._conn:
+            if not self._touch(session_id, time.time()):
+                return
+            self._conn.execute(
+                "DELETE FROM session_records WHERE session_id = ? AND kind = 'q' AND position >= ?", (session_id, start)
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO session_records (session_id, kind, position, payload) VALUES (?, 'q', ?, ?)",
+                [(session_id, pos, _dumps(questions[pos])) for pos in range(start, len(questions))],
+            )
+
+    def append_answer(self, session_id, position, record):
+        with self._lock, self._conn:
+            if not self._touch(session_id, time.time()):
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO session_records (session_id, kind, position, payload) VALUES (?, 'a', ?, ?)",
+                (session_id, position, _dumps(record)),
+            )
+
+    def load(self, session_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT meta FROM sessions WHERE session_id = ? AND updated_at >= ?",
+                (session_id, time.time() - self.ttl),
+            ).fetchone()
+            if row is None:
+                return None
+            records = self._conn.execute(
+                "SELECT kind, payload FROM session_records WHERE session_id = ? ORDER BY kind, position",
+                (session_id,),
+            ).fetchall()
+        session = {"meta": json.loads(row[0]), "questions": [], "answers": []}
+        for kind, payload in records:
+            session["questions" if kind == "q" else "answers"].append(json.loads(payload))
+        return session
+
+    def delete(self, session_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM session_records WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Stores each session under three keys (meta string, question list, answer hash),
+    all expiring together. `client` can be any redis-py compatible client, such as
+    fakeredis.FakeRedis(); otherwise one is created from `url`.
+    """
+
+    def __init__(self, url="redis://localhost:6379/0", ttl=DEFAULT_TTL, prefix="interview:session", client=None):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def _keys(self, session_id):
+        base = f"{self.prefix}:{session_id}"
+        return f"{base}:meta", f"{base}:questions", f"{base}:answers"
+
+    def _expire_all(self, pipe, keys):
+        for key in keys:
+            pipe.expire(key, self.ttl)
+
+    def create(self, session_id, meta, questions):
+        keys = self._keys(session_id)
+        pipe = self.client.pipeline()
+        pipe.delete(*keys)
+        pipe.set(keys[0], _dumps(meta))
+        if questions:
+            pipe.rpush(keys[1], *[_dumps(q) for q in questions])
+        self._expire_all(pipe, keys)
+        pipe.execute()
+
+    def add_questions(self, session_id, questions, start):
+        keys = self._keys(session_id)
+        if not self.client.exists(keys[0]):
+            return
+        pipe = self.client.pipeline()
+        if start:
+            pipe.ltrim(keys[1], 0, start - 1)
+        else:
+            pipe.delete(keys[1])
+        if questions[start:]:
+            pipe.rpush(keys[1], *[_dumps(q) for q in questions[start:]])
+        self._expire_all(pipe, keys)
+        pipe.execute()
+
+    def append_answer(self, session_id, position, record):
+        keys = self._keys(session_id)
+        if not self.client.exists(keys[0]):
+            return
+        pipe = self.client.pipeline()
+        pipe.hset(keys[2], str(position), _dumps(record))
+        self._expire_all(pipe, keys)
+        pipe.execute()
+
+    def load(self, session_id):
+        keys = self._keys(session_id)
+        pipe = self.client.pipeline()
+        pipe.get(keys[0])
+        pipe.lrange(keys[1], 0, -1)
+        pipe.hgetall(keys[2])
+        meta, questions, answers = pipe.execute()
+        if meta is None:
+            return None
+        return {
+            "meta": json.loads(meta),
+            "questions": [json.loads(q) for q in questions],
+            "answers": [json.loads(answers[pos]) for pos in sorted(answers, key=int)],
+        }
+
+    def delete(self, session_id):
+        self.client.delete(*self._keys(session_id))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Returns the process-wide session store selected by SESSION_STORE."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                backend = os.environ.get("SESSION_STORE", "memory").lower()
+                ttl = float(os.environ.get("SESSION_TTL", DEFAULT_TTL))
+                if backend == "sqlite":
+                    _store = SQLiteSessionStore(os.environ.get("SESSION_STORE_PATH", DEFAULT_STORE_PATH), ttl=ttl)
+                elif backend == "redis":
+                    _store = RedisSessionStore(os.environ.get("SESSION_STORE_URL", "redis://localhost:6379/0"), ttl=ttl)
+                else:
+                    _store = MemorySessionStore(ttl=ttl)
+    return _store
@@ -0,0 +1,109 @@
+import hashlib
+import json
+
+
+def calculate_ranking(score, total_questions, time_taken):
+    """Fixed-threshold tiers, used until there is enough history for percentile ranking."""
+    if total_questions == 0:
+        return "N/A", "Complete an interview to get a rank."
+
+    accuracy = (score / total_questions) * 100
+    avg_time_per_q = time_taken / total_questions
+
+    if accuracy >= 95 and avg_time_per_q < 30:
+        return "S-Tier (Godlike)", "Flawless accuracy and lightning-fast responses. Truly top-tier performance."
+    elif accuracy >= 80 and avg_time_per_q < 60:
+        return "A-Tier (Expert)", "High accuracy and great speed. You're well-prepared for technical challenges."
+    elif accuracy >= 60:
+        return "B-Tier (Proficient)", "Good accuracy. Focus on increasing your response speed and deepening your knowledge."
+    elif accuracy >= 40:
+        return "C-Tier (Competent)", "You have a foundational understanding. Consistent practice will improve your accuracy."
+    else:
+        return "D-Tier (Beginner)", "A good first step. Focus on reviewing fundamentals and trying again."
+
+
+def rank_interview(questions, feedback, time_taken, mode=None, elapsed_ms=None, session_id=None):
+    """
+    Percentile-based rank for a finished interview, or the fixed tiers if no history is available.
+    A stored interview with `session_id` (the one being ranked) is not part of the population.
+    """
+    correct = [fb.startswith("✅") for fb in feedback]
+    elapsed_seconds = [None if ms is None else ms / 1000 for ms in elapsed_ms] if elapsed_ms else None
+    try:
+        from utils.ranking import get_ranking_engine
+        return get_ranking_engine().rank(
+            correct, [q.get("difficulty") for q in questions[:len(correct)]], elapsed_seconds, time_taken, mode,
+            session_id,
+        )
+    except Exception as e:
+        print(f"Percentile ranking unavailable, using fixed tiers: {e}")
+        return calculate_ranking(sum(correct), len(questions), time_taken)
+
+
+def interview_fingerprint(questions, answers, feedback, score, time_taken):
+    """Stable hash identifying one finished interview, used as the summary cache key."""
+    payload = json.dumps(
+        [[q["q"] for q in questions], list(answers), list(feedback), score, round(time_taken, 3)],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def question_outcomes(answers, feedback):
+    """"correct", "incorrect" or "skipped" for each answered question."""
+    return tuple(
+        "skipped" if ans in ("Skipped", "Not Answered") else "correct" if fb.startswith("✅") else "incorrect"
+        for ans, fb in zip(answers, feedback)
+    )
+
+
+def topic_stats(questions, feedback):
+    """
+    ((topic, correct, total), ...) from the bank's tags. A question counts towards
+    each of its tags; AI-generated and untagged questions are grouped as "Other".
+    """
+    ids = [q["id"] for q in questions[:len(feedback)] if q.get("id") is not None]
+    tags = {}
+    if ids:
+        try:
+            from utils.question_bank import get_question_bank
+            tags = get_question_bank().tags(ids)
+        except Exception as e:
+            print(f"Question tags unavailable: {e}")
+    totals = {}
+    for q, fb in zip(questions, feedback):
+        for topic in tags.get(q.get("id")) or ["Other"]:
+            correct, total = totals.get(topic, (0, 0))
+            totals[topic] = (correct + fb.startswith("✅"), total + 1)
+    return tuple((topic, correct, total) for topic, (correct, total) in sorted(totals.items()))
+
+
+def build_summary_artifacts(questions, answers, feedback, score, time_taken, mode=None, elapsed_ms=None,
+                            interactive=False, scores=None, session_id=None):
+    """
+    Computes everything the summary page needs for a finished interview: the
+    ranking, SVG charts (overall, per question and per topic) and the PDF report
+    bytes. With `interactive`, the donut is also built as a plotly JSON dict.
+    `scores` (out of 10, per answer) are shown in the report for graded free-text answers.
+    `session_id` identifies the interview, so it is never ranked against itself.
+    """
+    # Reportlab (and plotly, if asked for) are imported only here, so the landing page does not pay for them
+    from utils.charts import create_donut_chart, donut_svg, question_breakdown_svg, topic_breakdown_svg
+    from utils.report import generate_report
+
+    total_questions = len(questions)
+    return {
+        "ranking": rank_interview(questions, feedback, time_taken, mode, elapsed_ms, session_id),
+        "donut_svg": donut_svg(score, total_questions),
+        "questions_svg": question_breakdown_svg(question_outcomes(answers, feedback), tuple(elapsed_ms or ())),
+        "topics_svg": topic_breakdown_svg(topic_stats(questions, feedback)),
+        "figure": json.loads(create_donut_chart(score, total_questions).to_json()) if interactive else None,
+        "pdf": generate_report(
+            [q['q'] for q in questions],
+            answers,
+            [
+                {"feedback": fb, "score": scores[i] if scores else (1 if '✅ Correct' in fb else 0)}
+                for i, fb in enumerate(feedback)
+            ]
+        ),
+    }
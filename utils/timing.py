@@ -0,0 +1,26 @@
+import time
+
+
+class PhaseTimer:
+    """
+    Records how long each phase of a Streamlit rerun takes.
+    Call lap(name) at the end of each phase; it measures the time since the previous lap.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases = []
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def format(self):
+        lines = [f"{name}: {seconds * 1000:.1f} ms" for name, seconds in self.phases]
+        lines.append(f"total: {self.total() * 1000:.1f} ms")
+        return "\n".join(lines)